@@ -0,0 +1,226 @@
+"""Headless benchmarks for the receive -> parse -> display pipeline.
+
+Run from the serial_monitor_app folder:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+
+Each stage is timed separately on synthetic PI/MB/BK traffic and the
+results are written as JSON. With --compare, stages that got slower than
+the given baseline by more than --tolerance are reported and the exit
+status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import matplotlib
+import PySide6
+from PySide6.QtWidgets import QApplication
+
+from utils.data_processor import DataProcessor, WaveformSnapshot
+from utils.timestamps import now_ns
+
+# --- Synthetic traffic ---
+def pi_lines(count, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 100, count)
+    return [f"PI,{i % 60},{v:.3f}" for i, v in enumerate(values)]
+
+def dump_lines(header, size=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = rng.integers(0, 4096, size)
+    return [f"{header},{a},{v}" for a, v in enumerate(samples.tolist())] + [f"{header},{max(size, 5000)},0"]
+
+def mixed_stream(dumps=4, pi_per_dump=600):
+    lines = []
+    for i in range(dumps):
+        lines += pi_lines(pi_per_dump, seed=i)
+        lines += dump_lines("MB" if i % 2 == 0 else "BK", seed=i)
+    return lines
+
+def batches(lines, size=256):
+    return [lines[i:i + size] for i in range(0, len(lines), size)]
+
+# --- Timing helpers ---
+def measure(func, repeat):
+    """Run func repeat times and return the per-call times in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+def summary(times, items_per_call=1):
+    median = statistics.median(times)
+    result = {
+        "median_ms": median * 1e3,
+        "best_ms": min(times) * 1e3,
+        "calls": len(times),
+    }
+    if items_per_call > 1:
+        result["items_per_call"] = items_per_call
+        result["items_per_s"] = items_per_call / median if median else float("inf")
+    return result
+
+# --- Stages ---
+def bench_process_line(repeat):
+    lines = mixed_stream()
+    processor = DataProcessor()
+    def run():
+        for line in lines:
+            processor.process_line(line)
+    return summary(measure(run, repeat), len(lines))
+
+def bench_process_batch(repeat):
+    lines = mixed_stream()
+    chunks = batches(lines)
+    processor = DataProcessor()
+    def run():
+        for chunk in chunks:
+            processor.process_batch(chunk)
+    return summary(measure(run, repeat), len(lines))
+
+def bench_route_received_data(app, repeat):
+    from gui.main_window import MainWindow
+    window = MainWindow()
+    lines = mixed_stream()
+    chunks = [(chunk, [now_ns()] * len(chunk)) for chunk in batches(lines)]
+    def run():
+        for chunk, stamps in chunks:
+            window.route_received_data(chunk, stamps)
+        app.processEvents()
+    result = summary(measure(run, repeat), len(lines))
+    result["us_per_line"] = result["median_ms"] * 1e3 / len(lines)
+    window.close()
+    return result
+
+def bench_graph_redraw(app, window_class, repeat, backend="matplotlib"):
+    window = window_class(backend=backend)
+    window.resize(800, 700)
+    window.show()
+    # A dump of the window's own buffer, so the BK windows keep their channel split
+    geometry = window.buffer_geometry
+    data = np.random.default_rng(0).integers(0, 4096, geometry.size).astype(float)
+    window.update_and_plot(WaveformSnapshot(window.buf_type, 1, data, geometry=geometry))
+    app.processEvents()
+    def run():
+        window.apply_and_redraw()
+        app.processEvents()
+    result = summary(measure(run, repeat))
+    window.close()
+    return result
+
+def bench_value_window(app, repeat):
+    from gui.value_window import ValueWindow
+    from utils.value_store import ValueStore
+    store = ValueStore()
+    window = ValueWindow(store)
+    window.show()
+    updates = [(i % 60, f"{v:.3f}") for i, v in enumerate(np.random.default_rng(0).normal(0, 100, 6000))]
+    def run():
+        for index, value in updates:
+            store.update(index, value, 0)
+            window.update_value(index, value)
+        window.refresh_display()
+        app.processEvents()
+    result = summary(measure(run, repeat), len(updates))
+    window.close()
+    return result
+
+def bench_logging_widget(app, repeat):
+    from gui.logging_widget import LoggingWidget
+    from utils.value_store import ValueStore
+    store = ValueStore()
+    for i in range(60):
+        store.update(i, f"{i * 1.5:.3f}", 0)
+    widget = LoggingWidget(store)
+    with tempfile.TemporaryDirectory() as folder:
+        widget.folder_label.setText(folder)
+        widget.filename_edit.setText("bench.csv")
+        widget.start_logging()
+        result = summary(measure(widget.log_current_values, repeat))
+        widget.stop_logging()
+    return result
+
+def run_all(repeat):
+    app = QApplication.instance() or QApplication(sys.argv)
+    from gui.graph_window import GraphWindow
+    from gui.bk_graph_window import BKGraphWindow
+    stages = {
+        "process_line": lambda: bench_process_line(repeat),
+        "process_batch": lambda: bench_process_batch(repeat),
+        "route_received_data": lambda: bench_route_received_data(app, repeat),
+        "graph_window_redraw": lambda: bench_graph_redraw(app, GraphWindow, repeat * 4),
+        "bk_graph_window_redraw": lambda: bench_graph_redraw(app, BKGraphWindow, repeat * 4),
+        "qt_graph_window_redraw": lambda: bench_graph_redraw(app, GraphWindow, repeat * 4, "qt"),
+        "qt_bk_graph_window_redraw": lambda: bench_graph_redraw(app, BKGraphWindow, repeat * 4, "qt"),
+        "value_window_update": lambda: bench_value_window(app, repeat),
+        "logging_widget_write": lambda: bench_logging_widget(app, repeat * 20),
+    }
+    results = {}
+    for name, stage in stages.items():
+        results[name] = stage()
+        print(f"{name:24s} median {results[name]['median_ms']:9.3f} ms", file=sys.stderr)
+    return {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "pyside6": PySide6.__version__,
+            "repeat": repeat,
+        },
+        "stages": results,
+    }
+
+def compare(results, baseline, tolerance):
+    """Return the stages whose median got slower than baseline by more than tolerance."""
+    regressions = []
+    for name, stage in results["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base:
+            continue
+        ratio = stage["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        print(f"{name:24s} {base['median_ms']:9.3f} -> {stage['median_ms']:9.3f} ms  x{ratio:.2f}", file=sys.stderr)
+        if ratio > 1.0 + tolerance:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the receive/parse/display pipeline")
+    parser.add_argument("--output", help="write JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a stage counts as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per stage")
+    args = parser.parse_args()
+
+    results = run_all(args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ class ConnectionWidget(QWidget):
         connection_layout = QGridLayout()
 
         self.com_port_combo = QComboBox()
+        # Editable so device paths that are not enumerated (e.g. a simulator pty) can be typed
+        self.com_port_combo.setEditable(True)
         self.baud_rate_combo = QComboBox()
         self.baud_rate_combo.addItems(["9600", "19200", "38400", "57600", "115200"])
         self.baud_rate_combo.setCurrentText("9600")
@@ -19,6 +21,13 @@ class ConnectionWidget(QWidget):
         self.open_button = QPushButton("Connect")
         self.close_button = QPushButton("Disconnect")
         self.close_button.setEnabled(False)
+        self.record_button = QPushButton("Record")
+        self.record_button.setCheckable(True)
+        self.record_button.setToolTip("Record all received bytes to a capture file")
+        self.replay_button = QPushButton("Replay...")
+        self.replay_button.setToolTip("Feed a recorded capture file into the app")
+        self.replay_speed_combo = QComboBox()
+        self.replay_speed_combo.addItems(["x1", "x10", "Max"])
 
         connection_layout.addWidget(QLabel("COM Port:"), 0, 0)
         connection_layout.addWidget(self.com_port_combo, 0, 1)
@@ -28,6 +37,9 @@ class ConnectionWidget(QWidget):
         connection_layout.addWidget(self.parity_combo, 0, 5)
         connection_layout.addWidget(self.open_button, 1, 0, 1, 3)
         connection_layout.addWidget(self.close_button, 1, 3, 1, 3)
+        connection_layout.addWidget(self.record_button, 2, 0, 1, 3)
+        connection_layout.addWidget(self.replay_button, 2, 3, 1, 2)
+        connection_layout.addWidget(self.replay_speed_combo, 2, 5)
         
         connection_group.setLayout(connection_layout)
 
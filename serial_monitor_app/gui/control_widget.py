@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QLabel, QPushButton, QLineEdit, 
-    QGroupBox, QHBoxLayout
+    QGroupBox, QHBoxLayout, QComboBox, QCheckBox
 )
 from PySide6.QtCore import Signal
 
@@ -24,12 +24,28 @@ class ControlWidget(QWidget):
         self.new_mem_graph_button = QPushButton("Graph")
         self.new_bk_graph_button = QPushButton("Err wave")
         self.show_eeprom_button = QPushButton("EEPROM")
+        self.show_trend_button = QPushButton("Trend")
         buttons_layout.addWidget(self.show_values_button)
         buttons_layout.addWidget(self.new_mem_graph_button)
         buttons_layout.addWidget(self.new_bk_graph_button)
         buttons_layout.addWidget(self.show_eeprom_button)
+        buttons_layout.addWidget(self.show_trend_button)
         buttons_layout.addStretch(1)
         view_layout.addLayout(buttons_layout)
+
+        # Plotting backend used by newly opened graph windows
+        backend_layout = QHBoxLayout()
+        self.plot_backend_combo = QComboBox()
+        self.plot_backend_combo.addItem("Matplotlib", "matplotlib")
+        self.plot_backend_combo.addItem("Qt (fast)", "qt")
+        backend_layout.addWidget(QLabel("Plot backend:"))
+        backend_layout.addWidget(self.plot_backend_combo)
+        backend_layout.addStretch(1)
+        view_layout.addLayout(backend_layout)
+
+        # Save every MB/BK dump to an archive folder
+        self.archive_checkbox = QCheckBox("Archive dumps (.npz)")
+        view_layout.addWidget(self.archive_checkbox)
         view_group.setLayout(view_layout)
 
         # --- Automation Group ---
@@ -1,23 +1,52 @@
 import numpy as np
 from PySide6.QtCore import Signal, Qt
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QDoubleSpinBox, QLabel, QGroupBox, QPushButton
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QDoubleSpinBox, QLabel, QGroupBox, QPushButton, QCheckBox
 )
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
 from .matplotlib_widget import MatplotlibWidget
+from .qt_plot_widget import QtPlotWidget
+from .render_scheduler import RenderScheduler
+from utils.geometry import DEFAULT_GEOMETRY
+
+def clear_layout(layout):
+    """Remove and delete everything inside a layout."""
+    while layout.count():
+        item = layout.takeAt(0)
+        if item.widget():
+            item.widget().hide()
+            item.widget().deleteLater()
+        elif item.layout():
+            clear_layout(item.layout())
 
 class GraphWindow(QMainWindow):
-    """A window to display the matplotlib graph with gain/offset controls."""
+    """A window to display the matplotlib graph with gain/offset controls.
+
+    Subclasses for other buffers only change the class attributes below.
+    """
     closing = Signal()
+    buf_type = "MB"
+    title = "Graph View"
+    position = (200, 200)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, scheduler=None, backend="matplotlib", geometry=None):
         super().__init__(parent)
-        self.setWindowTitle("Graph View")
-        self.setGeometry(200, 200, 800, 700)
+        self.setWindowTitle(self.title)
+        self.setGeometry(*self.position, 800, 700)
 
         self.original_data = None
+        self.snapshot = None
+        # Roll mode plots the streamed samples instead of complete dumps
+        self.roll_mode = False
+        self.stream = None
+        self.roll_input = None
         self.controls = {}
         self.is_autoscale = True
+        # Channel split of the buffer, normally taken from the snapshots
+        self.buffer_geometry = geometry or DEFAULT_GEOMETRY[self.buf_type]
+        self.num_channels = self.buffer_geometry.num_channels
+        self.points_per_channel = self.buffer_geometry.points_per_channel
+        self._init_buffers()
 
         # --- Main Layout ---
         central_widget = QWidget()
@@ -25,9 +54,13 @@ class GraphWindow(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # --- Graph Widget and Toolbar ---
-        self.graph_widget = MatplotlibWidget()
-        toolbar = NavigationToolbar2QT(self.graph_widget.canvas, self)
-        main_layout.addWidget(toolbar)
+        # The Qt backend has its own zoom/pan/hover and needs no toolbar
+        if backend == "qt":
+            self.graph_widget = QtPlotWidget()
+        else:
+            self.graph_widget = MatplotlibWidget()
+            toolbar = NavigationToolbar2QT(self.graph_widget.canvas, self)
+            main_layout.addWidget(toolbar)
         main_layout.addWidget(self.graph_widget, 1)
 
         # --- Scale and Clear Controls ---
@@ -43,6 +76,7 @@ class GraphWindow(QMainWindow):
         apply_scale_button = QPushButton("Apply Y-Scale")
         auto_scale_button = QPushButton("Auto Scale")
         clear_button = QPushButton("Clear Graph")
+        self.roll_checkbox = QCheckBox("Roll mode")
 
         scale_clear_layout.addWidget(QLabel("Y-Min:"))
         scale_clear_layout.addWidget(self.y_min_spinbox)
@@ -50,6 +84,7 @@ class GraphWindow(QMainWindow):
         scale_clear_layout.addWidget(self.y_max_spinbox)
         scale_clear_layout.addWidget(apply_scale_button)
         scale_clear_layout.addWidget(auto_scale_button)
+        scale_clear_layout.addWidget(self.roll_checkbox)
         scale_clear_layout.addStretch(1)
         scale_clear_layout.addWidget(clear_button)
         scale_clear_group.setLayout(scale_clear_layout)
@@ -59,7 +94,29 @@ class GraphWindow(QMainWindow):
         controls_group = QGroupBox("Channel Controls")
         controls_layout = QHBoxLayout()
         
-        for i in range(4): # 4 Channels
+        self.controls_layout = controls_layout
+        self._build_channel_controls()
+
+        controls_group.setLayout(controls_layout)
+        main_layout.addWidget(controls_group, 0)
+
+        # --- Connect signals ---
+        apply_scale_button.clicked.connect(self.apply_y_scale)
+        auto_scale_button.clicked.connect(self.enable_auto_scale)
+        clear_button.clicked.connect(self.clear_graph)
+        self.roll_checkbox.toggled.connect(self.set_roll_mode)
+
+        # Redraws go through the scheduler, which renders at most once per frame
+        self.scheduler = scheduler or RenderScheduler.instance()
+        self.scheduler.register(self)
+
+    def _build_channel_controls(self):
+        """(Re)create one gain/offset pair per channel, keeping existing values."""
+        previous = {i: (c['gain'].value(), c['offset'].value()) for i, c in self.controls.items()}
+        clear_layout(self.controls_layout)
+        self.controls = {}
+        for i in range(self.num_channels):
+            gain, offset = previous.get(i, (1.0, 0.0))
             ch_layout = QVBoxLayout()
             ch_label = QLabel(f"Channel {i+1}")
             ch_label.setAlignment(Qt.AlignCenter)
@@ -68,7 +125,7 @@ class GraphWindow(QMainWindow):
             gain_label = QLabel("Gain:")
             gain_spinbox = QDoubleSpinBox()
             gain_spinbox.setRange(-1000.0, 1000.0)
-            gain_spinbox.setValue(1.0)
+            gain_spinbox.setValue(gain)
             gain_spinbox.setDecimals(4)
             gain_spinbox.setSingleStep(0.1)
             gain_layout.addWidget(gain_label)
@@ -78,7 +135,7 @@ class GraphWindow(QMainWindow):
             offset_label = QLabel("Offset:")
             offset_spinbox = QDoubleSpinBox()
             offset_spinbox.setRange(-10000.0, 10000.0)
-            offset_spinbox.setValue(0.0)
+            offset_spinbox.setValue(offset)
             offset_spinbox.setDecimals(4)
             offset_spinbox.setSingleStep(1.0)
             offset_layout.addWidget(offset_label)
@@ -86,62 +143,118 @@ class GraphWindow(QMainWindow):
 
             self.controls[i] = {'gain': gain_spinbox, 'offset': offset_spinbox}
 
-            gain_spinbox.valueChanged.connect(self.apply_and_redraw)
-            offset_spinbox.valueChanged.connect(self.apply_and_redraw)
+            gain_spinbox.valueChanged.connect(self.request_redraw)
+            offset_spinbox.valueChanged.connect(self.request_redraw)
 
             ch_layout.addWidget(ch_label)
             ch_layout.addLayout(gain_layout)
             ch_layout.addLayout(offset_layout)
-            controls_layout.addLayout(ch_layout)
+            self.controls_layout.addLayout(ch_layout)
 
-        controls_group.setLayout(controls_layout)
-        main_layout.addWidget(controls_group, 0)
+    def set_geometry(self, geometry):
+        """Switch to another channel split; buffers are only reallocated here."""
+        if geometry == self.buffer_geometry:
+            return
+        self.buffer_geometry = geometry
+        self.num_channels = geometry.num_channels
+        self.points_per_channel = geometry.points_per_channel
+        self._init_buffers()
+        self._build_channel_controls()
+        self.original_data = None
+        self.snapshot = None
+        self.graph_widget.clear_plot()
+        self.request_redraw()
 
-        # --- Connect signals ---
-        apply_scale_button.clicked.connect(self.apply_y_scale)
-        auto_scale_button.clicked.connect(self.enable_auto_scale)
-        clear_button.clicked.connect(self.clear_graph)
+    def _init_buffers(self):
+        shape = (self.num_channels, self.points_per_channel)
+        self.gains = np.ones(self.num_channels)
+        self.offsets = np.zeros(self.num_channels)
+        self.processed_buffer = np.empty(shape)
+
+    def update_and_plot(self, snapshot):
+        """Show a WaveformSnapshot; it is shared with other windows, not copied."""
+        if self.snapshot is not None and snapshot.version == self.snapshot.version:
+            return
+        if snapshot.geometry != self.buffer_geometry:
+            self.set_geometry(snapshot.geometry)
+        count = self.num_channels * self.points_per_channel
+        if snapshot.data.size < count:
+            return
+        self.snapshot = snapshot
+        # Read-only (channels x points) view into the shared snapshot
+        self.original_data = snapshot.data[:count].reshape(self.num_channels, self.points_per_channel)
+        if not self.roll_mode:
+            self.request_redraw()
+
+    def update_stream(self, stream):
+        """Take the processor's ChannelRingBuffer after new samples were streamed."""
+        self.stream = stream
+        if self.roll_mode:
+            self.request_redraw()
+
+    def set_roll_mode(self, enabled):
+        self.roll_mode = enabled
+        self.request_redraw()
 
-    def update_and_plot(self, original_data):
-        self.original_data = original_data.copy()
-        self.apply_and_redraw()
+    def _roll_source(self):
+        """Copy the rings oldest-to-newest into a buffer that is reused between frames."""
+        if self.stream is None or self.stream.num_channels != self.num_channels:
+            return None
+        shape = (self.num_channels, self.stream.capacity)
+        if self.roll_input is None or self.roll_input.shape != shape:
+            self.roll_input = np.empty(shape)
+            self.roll_processed = np.empty(shape)
+        return self.stream.copy_ordered(self.roll_input)
+
+    def request_redraw(self):
+        self.scheduler.mark_dirty(self)
+
+    def channel_settings(self):
+        """Return the (gains, offsets) currently set in the channel controls."""
+        gains = np.array([self.controls[i]['gain'].value() for i in range(self.num_channels)])
+        offsets = np.array([self.controls[i]['offset'].value() for i in range(self.num_channels)])
+        return gains, offsets
 
     def apply_and_redraw(self):
-        if self.original_data is None:
+        """Render the current data now; normally called by the scheduler."""
+        if self.roll_mode:
+            source = self._roll_source()
+            output = self.roll_processed if source is not None else None
+        else:
+            source, output = self.original_data, self.processed_buffer
+        if source is None:
+            self.graph_widget.redraw()
             return
 
-        processed_data = self.original_data.copy()
-        points_per_channel = 1024
-
-        for i in range(4):
-            gain = self.controls[i]['gain'].value()
-            offset = self.controls[i]['offset'].value()
-            start_index = i * points_per_channel
-            end_index = start_index + points_per_channel
-            processed_data[start_index:end_index] = self.original_data[start_index:end_index] * gain + offset
+        for i, control in self.controls.items():
+            self.gains[i] = control['gain'].value()
+            self.offsets[i] = control['offset'].value()
+        # One broadcast over the (channels x points) view, no temporaries
+        np.multiply(source, self.gains[:, None], out=output)
+        output += self.offsets[:, None]
 
-        self.graph_widget.plot_data(processed_data)
-        if not self.is_autoscale:
-            self.apply_y_scale()
+        self.graph_widget.plot_data(output.reshape(-1), num_channels=self.num_channels, points_per_channel=output.shape[1])
 
     def apply_y_scale(self):
         self.is_autoscale = False
         y_min = self.y_min_spinbox.value()
         y_max = self.y_max_spinbox.value()
-        self.graph_widget.axes.set_ylim(y_min, y_max)
-        self.graph_widget.canvas.draw()
+        self.graph_widget.set_y_limits(y_min, y_max)
+        self.request_redraw()
 
     def enable_auto_scale(self):
         self.is_autoscale = True
-        self.graph_widget.axes.autoscale(enable=True, axis='y')
-        self.apply_and_redraw() # Redraw to apply auto-scaling
+        self.graph_widget.enable_autoscale()
+        self.request_redraw() # Redraw to apply auto-scaling
 
     def clear_graph(self):
         self.original_data = None
-        self.graph_widget.axes.clear()
-        self.graph_widget.axes.grid(True, which='both', linestyle='--', linewidth=0.5)
-        self.graph_widget.canvas.draw()
+        self.snapshot = None
+        self.stream = None
+        self.graph_widget.clear_plot()
+        self.request_redraw()
 
     def closeEvent(self, event):
+        self.scheduler.unregister(self)
         self.closing.emit()
         super().closeEvent(event)
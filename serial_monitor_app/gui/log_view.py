@@ -0,0 +1,182 @@
+from collections import deque
+from PySide6.QtWidgets import QAbstractScrollArea, QApplication
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QPainter, QKeySequence
+from utils.timestamps import format_stamp
+
+class LogView(QAbstractScrollArea):
+    """Read-only receive log with a bounded line ring and throttled flushing.
+
+    Appended lines are queued and moved into the ring at most fps times per
+    second. Only the rows inside the viewport are painted, so the cost of an
+    append does not depend on how many lines are stored. Once max_lines is
+    reached the oldest lines are dropped.
+
+    Each entry is a (stamp_ns, text) pair; receive stamps are formatted only
+    when the row is painted or copied.
+    """
+    def __init__(self, max_lines=100000, fps=30, parent=None):
+        super().__init__(parent)
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)
+        self._pending = []
+        self._max_width = 0
+        # Selection as absolute line numbers, so it survives lines being dropped
+        self._dropped = 0
+        self._anchor = None
+        self._cursor = None
+
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.viewport().setCursor(Qt.IBeamCursor)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(int(1000 / fps))
+        self.flush_timer.timeout.connect(self.flush)
+
+    # --- Appending ---
+    def append(self, text):
+        """Queue text for display without a timestamp; multi-line text becomes several rows."""
+        self.append_lines(text.split('\n'))
+
+    def append_lines(self, lines, stamps=None):
+        """Queue lines, optionally with their monotonic receive stamps."""
+        if stamps is None:
+            self._pending.extend((None, line) for line in lines)
+        else:
+            self._pending.extend(zip(stamps, lines))
+        if len(self._pending) > self.max_lines:
+            del self._pending[:-self.max_lines]
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        if not self._pending:
+            return
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        dropped = max(0, len(self._lines) + len(self._pending) - self.max_lines)
+        self._lines.extend(self._pending)
+        self._pending = []
+        self._dropped += dropped
+
+        self._update_scroll_range()
+        # Follow new lines only if the user has not scrolled up; otherwise keep
+        # the same lines on screen while old ones fall off the front
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+        elif dropped:
+            scroll_bar.setValue(scroll_bar.value() - dropped)
+        self.viewport().update()
+
+    def clear(self):
+        self._pending.clear()
+        self._dropped += len(self._lines)
+        self._lines.clear()
+        self._anchor = self._cursor = None
+        self._max_width = 0
+        self._update_scroll_range()
+        self.viewport().update()
+
+    def line_count(self):
+        return len(self._lines) + len(self._pending)
+
+    # --- Geometry ---
+    def _line_height(self):
+        return self.fontMetrics().lineSpacing()
+
+    def _visible_rows(self):
+        return max(1, self.viewport().height() // self._line_height())
+
+    def _update_scroll_range(self):
+        rows = self._visible_rows()
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.setPageStep(rows)
+        scroll_bar.setRange(0, max(0, len(self._lines) - rows))
+        h_bar = self.horizontalScrollBar()
+        h_bar.setPageStep(self.viewport().width())
+        h_bar.setRange(0, max(0, self._max_width - self.viewport().width()))
+
+    def _row_at(self, y):
+        row = self.verticalScrollBar().value() + int(y) // self._line_height()
+        return min(max(row, 0), len(self._lines) - 1)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scroll_range()
+
+    # --- Painting ---
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.fontMetrics()
+        line_height = metrics.lineSpacing()
+        first = self.verticalScrollBar().value()
+        last = min(len(self._lines), first + self._visible_rows() + 1)
+        x = -self.horizontalScrollBar().value()
+        selection = self._selection_range()
+        palette = self.palette()
+        widest = self._max_width
+
+        for row in range(first, last):
+            text = self._entry_text(self._lines[row])
+            y = (row - first) * line_height
+            if selection and selection[0] <= row + self._dropped <= selection[1]:
+                painter.fillRect(0, y, self.viewport().width(), line_height, palette.highlight())
+                painter.setPen(palette.highlightedText().color())
+            else:
+                painter.setPen(palette.text().color())
+            painter.drawText(x, y + metrics.ascent(), text)
+            widest = max(widest, metrics.horizontalAdvance(text))
+        painter.end()
+
+        if widest > self._max_width:
+            # Widths are only measured for painted rows
+            self._max_width = widest
+            self._update_scroll_range()
+
+    @staticmethod
+    def _entry_text(entry):
+        stamp_ns, text = entry
+        return text if stamp_ns is None else f"{format_stamp(stamp_ns)} {text}"
+
+    # --- Selection and copy ---
+    def _selection_range(self):
+        if self._anchor is None or self._cursor is None:
+            return None
+        return min(self._anchor, self._cursor), max(self._anchor, self._cursor)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self._lines:
+            line = self._row_at(event.position().y()) + self._dropped
+            if not (event.modifiers() & Qt.ShiftModifier) or self._anchor is None:
+                self._anchor = line
+            self._cursor = line
+            self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self._anchor is not None and self._lines:
+            self._cursor = self._row_at(event.position().y()) + self._dropped
+            self.viewport().update()
+        super().mouseMoveEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy_selection()
+            return
+        if event.matches(QKeySequence.SelectAll) and self._lines:
+            self._anchor = self._dropped
+            self._cursor = self._dropped + len(self._lines) - 1
+            self.viewport().update()
+            return
+        super().keyPressEvent(event)
+
+    def copy_selection(self):
+        selection = self._selection_range()
+        if not selection:
+            return
+        first = max(selection[0] - self._dropped, 0)
+        last = min(selection[1] - self._dropped, len(self._lines) - 1)
+        if first <= last:
+            QApplication.clipboard().setText('\n'.join(self._entry_text(self._lines[row]) for row in range(first, last + 1)))
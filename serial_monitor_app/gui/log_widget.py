@@ -1,7 +1,8 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QTextEdit, QPushButton, QGroupBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QGroupBox
 )
 from PySide6.QtCore import Qt
+from .log_view import LogView
 
 class LogWidget(QWidget):
     def __init__(self, parent=None):
@@ -16,8 +17,8 @@ class LogWidget(QWidget):
         send_layout.addWidget(self.send_textbox)
         send_layout.addWidget(self.send_button)
 
-        self.receive_textbox = QTextEdit()
-        self.receive_textbox.setReadOnly(True)
+        # Bounded, virtualized view; append()/clear() match the old QTextEdit usage
+        self.receive_textbox = LogView(max_lines=100000, fps=30)
         self.clear_button = QPushButton("Clear")
 
         log_layout.addLayout(send_layout)
@@ -1,21 +1,81 @@
 import os
-import csv
 from datetime import datetime
+from functools import partial
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QGroupBox, QLabel, QLineEdit, QPushButton,
-    QFileDialog, QRadioButton, QButtonGroup
+    QFileDialog, QRadioButton, QButtonGroup, QCheckBox, QComboBox, QHBoxLayout, QSpinBox,
+    QDoubleSpinBox
 )
 from PySide6.QtCore import QTimer, Signal
+from utils.log_writer import LogWriter
+from utils.binary_log import BinaryLogWriter, export_csv, EXTENSION
+from utils.timestamps import now_ns, format_datetime
+
+# Values logged by the "right column only" option
+RIGHT_COLUMN = range(45, 60)
+
+def format_snapshot_row(row):
+    stamp_ns, values = row
+    return [format_datetime(stamp_ns)] + values
+
+def format_event_row(labels, row):
+    stamp_ns, index, value = row
+    label = labels[index] if 0 <= index < len(labels) else ""
+    return [format_datetime(stamp_ns, fraction=True), stamp_ns, index, label, value]
+
+def format_binary_snapshot_row(row):
+    stamp_ns, numbers = row
+    return (stamp_ns, *numbers.tolist())
+
+def format_binary_event_row(row):
+    stamp_ns, index, value = row
+    try:
+        number = float(value)
+    except ValueError:
+        number = float('nan')
+    return (stamp_ns, index, number)
+
+def events_path(path):
+    """Path of the event log written next to the snapshot log."""
+    base, ext = os.path.splitext(path)
+    return f"{base}_events{ext}"
 
 class LoggingWidget(QWidget):
+    """Logs the PI values to CSV once per second.
+
+    The values and labels are read from a ValueStore, not from the value
+    window, so logging does not depend on what the widgets show. Rows are
+    written by a LogWriter thread; the GUI thread only queues them.
+
+    With event logging on, every pi_data_updated is also written to a
+    second file (<name>_events.csv) with its receive stamp, index and
+    value, so updates between the snapshot ticks are not lost.
+
+    In the binary format both logs are written as .smlog files (see
+    utils.binary_log) holding the parsed numbers; CSV変換 turns one back
+    into CSV.
+
+    For long runs the logs can be split into numbered segments by size
+    and/or time; finished segments are compressed and pruned by the
+    writer's background compressor.
+    """
     logging_status_changed = Signal()
 
-    def __init__(self, value_window, parent=None):
+    def __init__(self, value_store, parent=None):
         super().__init__(parent)
-        self.value_window = value_window
+        self.value_store = value_store
         self.log_timer = QTimer(self)
         self.log_file_path = ""
         self.is_logging = False
+        self.binary = False
+        self.log_writer = None
+        self.event_writer = None
+        # Indices chosen when logging started; None logs every index
+        self.snapshot_indices = None
+        self.event_indices = None
+        # Seconds between flushes / fsyncs of the log file (fsync 0: only on stop)
+        self.flush_interval = 1.0
+        self.fsync_interval = 10.0
 
         main_layout = QVBoxLayout(self)
         logging_group = QGroupBox("Logging")
@@ -41,6 +101,9 @@ class LoggingWidget(QWidget):
         self.log_radio_group.addButton(self.radio_right)
         logging_layout.addWidget(self.radio_all, 2, 0)
         logging_layout.addWidget(self.radio_right, 2, 1)
+        self.event_checkbox = QCheckBox("全イベント記録")
+        self.event_checkbox.setToolTip("受信したPI値をすべて受信時刻付きで *_events.csv に記録します")
+        logging_layout.addWidget(self.event_checkbox, 2, 2)
 
         self.start_btn = QPushButton("測定開始")
         self.stop_btn = QPushButton("測定停止")
@@ -51,8 +114,43 @@ class LoggingWidget(QWidget):
         logging_layout.addWidget(self.stop_btn, 3, 1)
         logging_layout.addWidget(self.init_btn, 3, 2)
 
+        # Log file format
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("CSV", "csv")
+        self.format_combo.addItem("バイナリ (.smlog)", "binary")
+        self.convert_btn = QPushButton("CSV変換")
+        logging_layout.addWidget(QLabel("形式:"), 4, 0)
+        logging_layout.addWidget(self.format_combo, 4, 1)
+        logging_layout.addWidget(self.convert_btn, 4, 2)
+
+        # Segment rotation for long runs (0 = off)
+        rotation_layout = QHBoxLayout()
+        self.rotate_mb_spin = QSpinBox()
+        self.rotate_mb_spin.setRange(0, 100000)
+        self.rotate_mb_spin.setSuffix(" MB")
+        self.rotate_mb_spin.setSpecialValueText("なし")
+        self.rotate_hours_spin = QDoubleSpinBox()
+        self.rotate_hours_spin.setRange(0, 720)
+        self.rotate_hours_spin.setDecimals(1)
+        self.rotate_hours_spin.setSuffix(" h")
+        self.rotate_hours_spin.setSpecialValueText("なし")
+        self.compression_combo = QComboBox()
+        self.compression_combo.addItem("圧縮なし", None)
+        self.compression_combo.addItem("gzip", "gzip")
+        self.compression_combo.addItem("lzma", "lzma")
+        self.keep_spin = QSpinBox()
+        self.keep_spin.setRange(0, 100000)
+        self.keep_spin.setSpecialValueText("無制限")
+        rotation_layout.addWidget(self.rotate_mb_spin)
+        rotation_layout.addWidget(self.rotate_hours_spin)
+        rotation_layout.addWidget(self.compression_combo)
+        rotation_layout.addWidget(QLabel("保持数:"))
+        rotation_layout.addWidget(self.keep_spin)
+        logging_layout.addWidget(QLabel("分割:"), 5, 0)
+        logging_layout.addLayout(rotation_layout, 5, 1, 1, 2)
+
         self.log_status_label = QLabel("Status: Idle")
-        logging_layout.addWidget(self.log_status_label, 4, 0, 1, 3)
+        logging_layout.addWidget(self.log_status_label, 6, 0, 1, 3)
 
         logging_group.setLayout(logging_layout)
         main_layout.addWidget(logging_group)
@@ -61,8 +159,20 @@ class LoggingWidget(QWidget):
         self.start_btn.clicked.connect(self.start_logging)
         self.stop_btn.clicked.connect(self.stop_logging)
         self.init_btn.clicked.connect(self.initialize_device)
+        self.convert_btn.clicked.connect(self.convert_to_csv)
         self.log_timer.timeout.connect(self.log_current_values)
 
+    def writer_options(self):
+        """Keyword arguments shared by every LogWriter of a logging run."""
+        return {
+            "flush_interval": self.flush_interval,
+            "fsync_interval": self.fsync_interval,
+            "max_bytes": self.rotate_mb_spin.value() * 1024 * 1024,
+            "max_seconds": self.rotate_hours_spin.value() * 3600,
+            "compression": self.compression_combo.currentData(),
+            "keep_segments": self.keep_spin.value(),
+        }
+
     def select_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "保存先フォルダを選択")
         if folder:
@@ -74,48 +184,115 @@ class LoggingWidget(QWidget):
         if not folder or not filename:
             self.log_status_label.setText("保存先とファイル名を指定してください")
             return
+        self.binary = self.format_combo.currentData() == "binary"
         self.log_file_path = os.path.join(folder, filename)
+        if self.binary:
+            self.log_file_path = os.path.splitext(self.log_file_path)[0] + EXTENSION
+        indices = self.snapshot_indices = self.logged_indices()
+        self.event_indices = None if indices is None else set(indices)
+        labels = self.value_store.get_labels()
+        options = self.writer_options()
         try:
-            with open(self.log_file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                if self.radio_right.isChecked():
-                    header = ["Timestamp"] + self.value_window.get_right_column_labels()
-                else:
-                    header = ["Timestamp"] + self.value_window.get_all_labels()
-                writer.writerow(header)
+            if self.binary:
+                columns = [("stamp_ns", "<i8")] + [(label, "<f8") for label in self.value_store.get_labels(indices)]
+                self.log_writer = BinaryLogWriter(self.log_file_path, columns, labels, format_binary_snapshot_row,
+                                                  **options)
+            else:
+                header = ["Timestamp"] + self.value_store.get_labels(indices)
+                self.log_writer = LogWriter(self.log_file_path, header, format_snapshot_row, **options)
+            if self.event_checkbox.isChecked() and self.binary:
+                self.event_writer = BinaryLogWriter(events_path(self.log_file_path),
+                                                    [("stamp_ns", "<i8"), ("index", "<i2"), ("value", "<f8")],
+                                                    labels, format_binary_event_row, **options)
+            elif self.event_checkbox.isChecked():
+                self.event_writer = LogWriter(events_path(self.log_file_path),
+                                              ["Timestamp", "Stamp_ns", "Index", "Label", "Value"],
+                                              partial(format_event_row, labels), **options)
         except Exception as e:
+            if self.log_writer is not None:
+                self.log_writer.close()
+                self.log_writer = None
             self.log_status_label.setText(f"Error: {e}")
             return
         self.is_logging = True
         self.log_timer.start(1000)
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
+        self.event_checkbox.setEnabled(False)
+        self.format_combo.setEnabled(False)
+        # The columns of the log are fixed until it is stopped
+        self.radio_all.setEnabled(False)
+        self.radio_right.setEnabled(False)
+        self.set_rotation_enabled(False)
         self.log_status_label.setText("Status: Logging...")
         self.logging_status_changed.emit()
 
     def stop_logging(self):
         self.log_timer.stop()
         self.is_logging = False
+        for writer in (self.log_writer, self.event_writer):
+            if writer is not None:
+                writer.close()
+        self.log_writer = None
+        self.event_writer = None
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
+        self.event_checkbox.setEnabled(True)
+        self.format_combo.setEnabled(True)
+        self.radio_all.setEnabled(True)
+        self.radio_right.setEnabled(True)
+        self.set_rotation_enabled(True)
         self.log_status_label.setText(f"Status: Stopped. Saved to {self.log_file_path}")
         self.logging_status_changed.emit()
 
+    def set_rotation_enabled(self, enabled):
+        for widget in (self.rotate_mb_spin, self.rotate_hours_spin, self.compression_combo, self.keep_spin):
+            widget.setEnabled(enabled)
+
+    def logged_indices(self):
+        return RIGHT_COLUMN if self.radio_right.isChecked() else None
+
+    def on_pi_event(self, index, value, stamp_ns):
+        """Slot for pi_data_updated: queue one event row."""
+        writer = self.event_writer
+        if writer is not None and (self.event_indices is None or index in self.event_indices):
+            writer.write((stamp_ns, index, value))
+
     def log_current_values(self):
-        if not self.log_file_path:
+        writer = self.log_writer
+        if writer is None:
+            return
+        error = writer.error or (self.event_writer.error if self.event_writer else None)
+        if error is not None:
+            self.stop_logging()
+            self.log_status_label.setText(f"Error: {error}")
+            return
+        if self.binary:
+            _, numbers, _, _ = self.value_store.snapshot(self.snapshot_indices)
+            writer.write((now_ns(), numbers))
+        else:
+            writer.write((now_ns(), self.value_store.raw_values(self.snapshot_indices)))
+        status = (f"Status: Logging... {writer.rows_written} rows, queue {writer.queue_depth}, "
+                  f"latency {writer.last_latency * 1000:.1f} ms (max {writer.max_latency * 1000:.1f} ms)")
+        if self.event_writer is not None:
+            status += f", events {self.event_writer.rows_written} (queue {self.event_writer.queue_depth})"
+        if writer.rotating:
+            status += f", segment {writer.segment}"
+            if writer.compressor.error is not None:
+                status += f" (compression error: {writer.compressor.error})"
+        self.log_status_label.setText(status)
+
+    def convert_to_csv(self):
+        path, _ = QFileDialog.getOpenFileName(self, "CSVに変換するログを選択", self.folder_label.text(),
+                                              f"Binary log (*{EXTENSION})")
+        if not path:
             return
         try:
-            with open(self.log_file_path, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                if self.radio_right.isChecked():
-                    values = self.value_window.get_right_column_values()
-                else:
-                    values = self.value_window.get_all_values()
-                writer.writerow([timestamp] + values)
+            csv_path = export_csv(path)
         except Exception as e:
             self.log_status_label.setText(f"Error: {e}")
-            self.stop_logging()
+            return
+        self.log_status_label.setText(f"Converted to {csv_path}")
 
     def initialize_device(self):
         self.log_status_label.setText("初期化コマンド送信（実装例）")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import numpy as np
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QMessageBox, QFileDialog, QComboBox, QStatusBar, QGroupBox
@@ -11,15 +12,23 @@ from PySide6.QtGui import QIntValidator
 
 from utils.serial_handler import SerialHandler
 from utils.data_processor import DataProcessor
+from utils.replay_handler import ReplayHandler
+from utils.geometry import load_geometry_profile
+from utils.pi_history import PIHistory
+from utils.value_store import ValueStore
+from utils.waveform_archive import WaveformArchiver
+from utils.timestamps import now_ns
 from gui.commands_widget import CommandsWidget
 from gui.value_window import ValueWindow
 from gui.graph_window import GraphWindow
 from gui.bk_graph_window import BKGraphWindow
+from gui.render_scheduler import RenderScheduler
 from gui.connection_widget import ConnectionWidget
 from gui.control_widget import ControlWidget
 from gui.log_widget import LogWidget
 from gui.logging_widget import LoggingWidget
 from gui.eeprom_window import EEPROMWindow
+from gui.trend_window import TrendWindow
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -34,9 +43,16 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 500, 700)
 
         self.serial_handler = SerialHandler()
+        self.replay_handler = ReplayHandler()
+        self.dump_count = 0
+        self.waveform_archiver = None
         self.data_processor = DataProcessor()
+        for geometry in (self.data_processor.mem_geometry, self.data_processor.bk_geometry):
+            self.set_frame_limits(geometry)
         self.auto_run_timer = QTimer(self)
-        self.value_window = ValueWindow()
+        # Latest PI values; the value window and logging read them from here
+        self.value_store = ValueStore()
+        self.value_window = ValueWindow(self.value_store)
         self.mem_graph_windows = []
         self.bk_graph_windows = []
         self.eeprom_window = EEPROMWindow()
@@ -44,6 +60,12 @@ class MainWindow(QMainWindow):
         self.command_history = []
         self.settings = QSettings("YourCompany", "SerialMonitorApp")
         self.history_index = 0
+        # All graph windows are rendered through one frame-rate-capped scheduler
+        self.render_scheduler = RenderScheduler(max_fps=int(self.settings.value("render_fps", 30)), parent=self)
+        # Bounded per-channel history of the PI values for the trend window
+        self.pi_history = PIHistory(capacity=int(self.settings.value("pi_history_length", 10000)))
+        self.trend_window = TrendWindow(self.pi_history, self.value_store.get_labels(),
+                                        scheduler=self.render_scheduler)
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -53,7 +75,7 @@ class MainWindow(QMainWindow):
         self.control_widget = ControlWidget()
         self.log_widget = LogWidget()
         self.commands_widget = CommandsWidget()
-        self.logging_widget = LoggingWidget(self.value_window)
+        self.logging_widget = LoggingWidget(self.value_store)
 
         top_controls_layout = QHBoxLayout()
         top_controls_layout.addWidget(self.control_widget)
@@ -73,6 +95,8 @@ class MainWindow(QMainWindow):
         # --- Connect signals and slots ---
         self.connection_widget.open_button.clicked.connect(self.open_port)
         self.connection_widget.close_button.clicked.connect(self.close_port)
+        self.connection_widget.record_button.toggled.connect(self.toggle_capture)
+        self.connection_widget.replay_button.clicked.connect(self.start_replay)
         self.connection_widget.com_port_combo.mousePressEvent = self.refresh_ports_on_click
         
         self.control_widget.auto_run_button.toggled.connect(self.toggle_auto_run)
@@ -80,6 +104,8 @@ class MainWindow(QMainWindow):
         self.control_widget.new_mem_graph_button.clicked.connect(self.open_new_mem_graph_window)
         self.control_widget.new_bk_graph_button.clicked.connect(self.open_new_bk_graph_window)
         self.control_widget.show_eeprom_button.clicked.connect(self.eeprom_window.show)
+        self.control_widget.show_trend_button.clicked.connect(self.trend_window.show)
+        self.control_widget.archive_checkbox.toggled.connect(self.toggle_archive)
 
         self.log_widget.send_button.clicked.connect(self.send_main_command)
         self.log_widget.clear_button.clicked.connect(self.log_widget.receive_textbox.clear)
@@ -89,12 +115,26 @@ class MainWindow(QMainWindow):
         self.serial_handler.port_opened.connect(self.on_port_opened)
         self.serial_handler.port_closed.connect(self.on_port_closed)
         self.serial_handler.port_error.connect(self.on_port_error)
-        self.serial_handler.data_received.connect(self.route_received_data)
+        self.serial_handler.lines_received.connect(self.route_received_data)
+        self.serial_handler.frame_received.connect(self.route_received_frame)
+
+        self.replay_handler.replay_started.connect(self.on_replay_started)
+        self.replay_handler.replay_finished.connect(self.on_replay_finished)
+        self.replay_handler.port_error.connect(self.on_port_error)
+        self.replay_handler.lines_received.connect(self.route_received_data)
+        self.replay_handler.frame_received.connect(self.route_received_frame)
 
         self.data_processor.parsing_error.connect(self.on_data_received)
+        self.data_processor.geometry_changed.connect(self.on_geometry_changed)
         self.data_processor.mem_data_updated.connect(self.update_mem_graphs)
         self.data_processor.bk_data_updated.connect(self.update_bk_graphs)
+        self.data_processor.mem_stream_updated.connect(self.update_mem_streams)
+        self.data_processor.bk_stream_updated.connect(self.update_bk_streams)
+        self.data_processor.pi_data_updated.connect(self.value_store.update)
         self.data_processor.pi_data_updated.connect(self.value_window.update_value)
+        self.data_processor.pi_data_updated.connect(self.pi_history.record)
+        self.data_processor.pi_data_updated.connect(self.trend_window.on_pi_updated)
+        self.data_processor.pi_data_updated.connect(self.logging_widget.on_pi_event)
         
         self.commands_widget.command_to_send.connect(self.send_data)
         self.eeprom_window.command_to_send.connect(self.send_data)
@@ -116,6 +156,14 @@ class MainWindow(QMainWindow):
             self.load_commands(config_path_json, silent=True)
         elif os.path.exists(config_path_txt):
             self.load_commands(config_path_txt, silent=True)
+        # Buffer layout for this profile; a device can still announce its own
+        geometry_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'geometry.json')
+        if os.path.exists(geometry_path):
+            try:
+                for geometry in load_geometry_profile(geometry_path).values():
+                    self.data_processor.set_geometry(geometry)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.log_widget.receive_textbox.append(f"--- Invalid geometry.json: {e} ---")
 
     def load_commands_from_file(self):
         config_dir = os.path.join(os.path.dirname(__file__), '..', 'config')
@@ -131,7 +179,7 @@ class MainWindow(QMainWindow):
         try:
             data = {
                 "commands": [self.commands_widget.command_entries[i].text() for i in range(33)],
-                "labels": [self.value_window.value_labels[i].text() for i in range(60)]
+                "labels": self.value_store.get_labels()
             }
             with open(file_path, 'w') as f:
                 json.dump(data, f, indent=4)
@@ -160,8 +208,8 @@ class MainWindow(QMainWindow):
                 if i < len(self.commands_widget.command_entries):
                     self.commands_widget.command_entries[i].setText(text)
             for i, text in enumerate(labels):
-                if i in self.value_window.value_labels:
-                    self.value_window.value_labels[i].setText(text)
+                self.value_window.set_label(i, text)
+            self.trend_window.set_labels(self.value_store.get_labels())
             if not silent:
                 self.log_widget.receive_textbox.append(f"--- Commands loaded from {os.path.basename(file_path)} ---")
         except FileNotFoundError:
@@ -171,13 +219,17 @@ class MainWindow(QMainWindow):
             if not silent:
                 QMessageBox.critical(self, "Error", f"Failed to load commands file: {e}")
 
-    def route_received_data(self, data):
-        timestamp = datetime.now().strftime("[%H:%M:%S.%f]")[:-3]
-        self.log_widget.receive_textbox.append(f"{timestamp} {data}")
+    def route_received_data(self, lines, stamps):
+        self.log_widget.receive_textbox.append_lines(lines, stamps)
         if self.is_eeprom_reading:
-            self.eeprom_window.append_to_read_buffer(data)
+            for line in lines:
+                self.eeprom_window.append_to_read_buffer(line)
         else:
-            self.data_processor.process_line(data)
+            self.data_processor.process_batch(lines, stamps)
+
+    def route_received_frame(self, frame, stamp_ns):
+        self.log_widget.receive_textbox.append_lines([f"<binary dump frame, {len(frame)} bytes>"], [stamp_ns])
+        self.data_processor.process_frame(frame, stamp_ns)
 
     def handle_eeprom_read_start(self):
         self.is_eeprom_reading = True
@@ -190,9 +242,12 @@ class MainWindow(QMainWindow):
         self.update_activity_label()
 
     def refresh_ports(self):
+        current = self.connection_widget.com_port_combo.currentText()
         self.connection_widget.com_port_combo.clear()
         ports = self.serial_handler.get_available_ports()
         self.connection_widget.com_port_combo.addItems(ports)
+        if current:
+            self.connection_widget.com_port_combo.setCurrentText(current)
 
     def refresh_ports_on_click(self, event):
         self.refresh_ports()
@@ -209,8 +264,64 @@ class MainWindow(QMainWindow):
         self.serial_handler.open_port(port, baudrate, parity)
 
     def close_port(self):
+        if self.replay_handler.is_running():
+            self.replay_handler.stop()
+            return
         self.serial_handler.close_port()
 
+    def start_replay(self):
+        if self.serial_handler.serial and self.serial_handler.serial.is_open:
+            self.on_port_error("Close the port before starting a replay.")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(self, "Replay Capture File", "", "Capture files (*.smcap);;All Files (*)")
+        if not file_path:
+            return
+        speeds = {"x1": 1.0, "x10": 10.0, "Max": 0}
+        self.replay_handler.start(file_path, speeds[self.connection_widget.replay_speed_combo.currentText()])
+
+    def on_replay_started(self):
+        self.dump_count = 0
+        self.connection_widget.open_button.setEnabled(False)
+        self.connection_widget.close_button.setEnabled(True)
+        self.connection_widget.replay_button.setEnabled(False)
+        self.connection_widget.replay_speed_combo.setEnabled(False)
+        self.connection_widget.record_button.setEnabled(False)
+        speed = self.connection_widget.replay_speed_combo.currentText()
+        self.log_widget.receive_textbox.append(f"--- Replay started: {self.replay_handler.port_name()} ({speed}) ---")
+        self.status_connection_label.setText(f"Replay: {self.replay_handler.port_name()}")
+
+    def on_replay_finished(self, stats):
+        self.connection_widget.open_button.setEnabled(True)
+        self.connection_widget.close_button.setEnabled(False)
+        self.connection_widget.replay_button.setEnabled(True)
+        self.connection_widget.replay_speed_combo.setEnabled(True)
+        self.connection_widget.record_button.setEnabled(True)
+        seconds = max(stats['seconds'], 1e-9)
+        self.log_widget.receive_textbox.append(
+            f"--- Replay finished: {stats['lines']} lines, {stats['frames']} frames, "
+            f"{self.dump_count} dumps in {stats['seconds']:.3f} s "
+            f"({stats['lines'] / seconds:.0f} lines/s, {self.dump_count / seconds:.1f} dumps/s) ---")
+        self.status_connection_label.setText("Disconnected")
+        self.statusBar.showMessage("Replay finished", 3000)
+
+    def toggle_capture(self, checked):
+        if checked:
+            default_name = f"capture_{datetime.now():%Y%m%d_%H%M%S}.smcap"
+            file_path, _ = QFileDialog.getSaveFileName(self, "Record Capture File", default_name, "Capture files (*.smcap);;All Files (*)")
+            if not file_path or not self.serial_handler.start_capture(file_path):
+                self.connection_widget.record_button.setChecked(False)
+                return
+            self.connection_widget.record_button.setText("Stop Recording")
+            self.log_widget.receive_textbox.append(f"--- Recording to {os.path.basename(file_path)} ---")
+        else:
+            capture = self.serial_handler.stop_capture()
+            self.connection_widget.record_button.setText("Record")
+            if capture:
+                if capture.error:
+                    self.on_port_error(f"Capture stopped by write error: {capture.error}")
+                self.log_widget.receive_textbox.append(
+                    f"--- Recording stopped: {capture.bytes_written} bytes in {capture.records} chunks ---")
+
     def send_main_command(self):
         data = self.log_widget.send_textbox.text()
         if data and (not self.command_history or self.command_history[-1] != data):
@@ -257,19 +368,77 @@ class MainWindow(QMainWindow):
         self.status_connection_label.setText("Error")
         self.statusBar.showMessage(message, 5000)
 
-    def on_data_received(self, data):
-        timestamp = datetime.now().strftime("[%H:%M:%S.%f]")[:-3]
-        self.log_widget.receive_textbox.append(f"{timestamp} {data}")
+    def on_data_received(self, data, stamp_ns=None):
+        if stamp_ns is None:
+            stamp_ns = now_ns()
+        self.log_widget.receive_textbox.append_lines([data], [stamp_ns])
+
+    def on_geometry_changed(self, geometry):
+        self.log_widget.receive_textbox.append(
+            f"--- {geometry.buf_type} geometry: {geometry.num_channels} x {geometry.points_per_channel} ({geometry.size} samples) ---")
+        self.set_frame_limits(geometry)
+        windows = self.mem_graph_windows if geometry.buf_type == "MB" else self.bk_graph_windows
+        for w in windows:
+            w.set_geometry(geometry)
+
+    def set_frame_limits(self, geometry):
+        self.serial_handler.set_frame_limit(geometry)
+        self.replay_handler.set_frame_limit(geometry)
+
+    def update_mem_graphs(self, snapshot):
+        self.dump_count += 1
+        # Hidden windows are skipped by the scheduler, not here, so they
+        # catch up when shown again
+        for w in self.mem_graph_windows:
+            w.update_and_plot(snapshot)
+        self.archive_snapshot(snapshot, self.mem_graph_windows)
 
-    def update_mem_graphs(self, original_data):
+    def update_bk_graphs(self, snapshot):
+        self.dump_count += 1
+        for w in self.bk_graph_windows:
+            w.update_and_plot(snapshot)
+        self.archive_snapshot(snapshot, self.bk_graph_windows)
+
+    def archive_snapshot(self, snapshot, windows):
+        archiver = self.waveform_archiver
+        if archiver is None:
+            return
+        if archiver.error is not None:
+            self.statusBar.showMessage(f"Archive error: {archiver.error}", 5000)
+            self.control_widget.archive_checkbox.setChecked(False)
+            return
+        num_channels = snapshot.geometry.num_channels
+        settings = [w.channel_settings() for w in windows if w.num_channels == num_channels]
+        gains = np.array([g for g, _ in settings]).reshape(-1, num_channels)
+        offsets = np.array([o for _, o in settings]).reshape(-1, num_channels)
+        archiver.archive(snapshot, gains, offsets)
+
+    def toggle_archive(self, checked):
+        if checked:
+            folder = QFileDialog.getExistingDirectory(self, "Select Archive Folder", self.settings.value("archive_folder", ""))
+            if not folder:
+                self.control_widget.archive_checkbox.setChecked(False)
+                return
+            try:
+                self.waveform_archiver = WaveformArchiver(folder)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to open archive folder: {e}")
+                self.control_widget.archive_checkbox.setChecked(False)
+                return
+            self.settings.setValue("archive_folder", folder)
+            self.statusBar.showMessage(f"Archiving dumps to {folder}", 3000)
+        elif self.waveform_archiver is not None:
+            archiver, self.waveform_archiver = self.waveform_archiver, None
+            archiver.close()
+            self.statusBar.showMessage(f"Archived {archiver.archived} dumps to {archiver.folder}", 5000)
+
+    def update_mem_streams(self, stream):
         for w in self.mem_graph_windows:
-            if w.isVisible():
-                w.update_and_plot(original_data)
+            w.update_stream(stream)
 
-    def update_bk_graphs(self, original_data):
+    def update_bk_streams(self, stream):
         for w in self.bk_graph_windows:
-            if w.isVisible():
-                w.update_and_plot(original_data)
+            w.update_stream(stream)
 
     def toggle_auto_run(self, checked):
         if checked:
@@ -304,20 +473,22 @@ class MainWindow(QMainWindow):
         self.send_data(command)
 
     def open_new_mem_graph_window(self):
-        new_window = GraphWindow(self)
+        new_window = GraphWindow(self, self.render_scheduler, self.control_widget.plot_backend_combo.currentData(),
+                                 self.data_processor.mem_geometry)
         new_window.closing.connect(lambda: self.remove_graph_window(new_window, 'mem'))
         self.mem_graph_windows.append(new_window)
         new_window.show()
-        if self.data_processor.mem_buf_original is not None:
-            new_window.update_and_plot(self.data_processor.mem_buf_original)
+        new_window.update_and_plot(self.data_processor.mem_snapshot)
+        new_window.update_stream(self.data_processor.mem_stream)
 
     def open_new_bk_graph_window(self):
-        new_window = BKGraphWindow(self)
+        new_window = BKGraphWindow(self, self.render_scheduler, self.control_widget.plot_backend_combo.currentData(),
+                                   self.data_processor.bk_geometry)
         new_window.closing.connect(lambda: self.remove_graph_window(new_window, 'bk'))
         self.bk_graph_windows.append(new_window)
         new_window.show()
-        if self.data_processor.bk_buf_original is not None:
-            new_window.update_and_plot(self.data_processor.bk_buf_original)
+        new_window.update_and_plot(self.data_processor.bk_snapshot)
+        new_window.update_stream(self.data_processor.bk_stream)
 
     def remove_graph_window(self, window, window_type):
         if window_type == 'mem' and window in self.mem_graph_windows:
@@ -334,19 +505,44 @@ class MainWindow(QMainWindow):
             self.connection_widget.com_port_combo.setCurrentText(port)
         self.connection_widget.baud_rate_combo.setCurrentText(self.settings.value("baudrate", "9600"))
         self.connection_widget.parity_combo.setCurrentText(self.settings.value("parity", "None"))
+        backend_index = self.control_widget.plot_backend_combo.findData(self.settings.value("plot_backend", "matplotlib"))
+        self.control_widget.plot_backend_combo.setCurrentIndex(max(backend_index, 0))
+        self.logging_widget.flush_interval = float(self.settings.value("log_flush_interval", 1.0))
+        self.logging_widget.fsync_interval = float(self.settings.value("log_fsync_interval", 10.0))
+        self.logging_widget.rotate_mb_spin.setValue(int(self.settings.value("log_rotate_mb", 0)))
+        self.logging_widget.rotate_hours_spin.setValue(float(self.settings.value("log_rotate_hours", 0)))
+        compression_index = self.logging_widget.compression_combo.findData(self.settings.value("log_compression", None))
+        self.logging_widget.compression_combo.setCurrentIndex(max(compression_index, 0))
+        self.logging_widget.keep_spin.setValue(int(self.settings.value("log_keep_segments", 0)))
 
     def closeEvent(self, event):
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("port", self.connection_widget.com_port_combo.currentText())
         self.settings.setValue("baudrate", self.connection_widget.baud_rate_combo.currentText())
         self.settings.setValue("parity", self.connection_widget.parity_combo.currentText())
+        self.settings.setValue("render_fps", self.render_scheduler.max_fps)
+        self.settings.setValue("plot_backend", self.control_widget.plot_backend_combo.currentData())
+        self.settings.setValue("pi_history_length", self.pi_history.capacity)
+        self.settings.setValue("log_flush_interval", self.logging_widget.flush_interval)
+        self.settings.setValue("log_fsync_interval", self.logging_widget.fsync_interval)
+        self.settings.setValue("log_rotate_mb", self.logging_widget.rotate_mb_spin.value())
+        self.settings.setValue("log_rotate_hours", self.logging_widget.rotate_hours_spin.value())
+        self.settings.setValue("log_compression", self.logging_widget.compression_combo.currentData())
+        self.settings.setValue("log_keep_segments", self.logging_widget.keep_spin.value())
+        if self.logging_widget.is_logging:
+            self.logging_widget.stop_logging()
+        if self.waveform_archiver is not None:
+            self.waveform_archiver.close()
         self.value_window.close()
         self.eeprom_window.close()
+        self.trend_window.close()
         for window in list(self.mem_graph_windows):
             window.close()
         for window in list(self.bk_graph_windows):
             window.close()
+        self.replay_handler.stop()
         self.close_port()
+        self.serial_handler.stop_capture()
         event.accept()
 
     def navigate_history(self, direction):
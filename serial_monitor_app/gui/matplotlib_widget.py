@@ -1,9 +1,24 @@
+import math
+import numpy as np
 from PySide6.QtWidgets import QWidget, QVBoxLayout
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from utils.decimation import minmax_decimate
 
 class MatplotlibWidget(QWidget):
-    """A custom widget to embed a Matplotlib plot in a PySide6 application."""
+    """A custom widget to embed a Matplotlib plot in a PySide6 application.
+
+    The per-channel lines are created once and updated with set_ydata. The
+    axes, grid and labels are rendered into a cached background, and a data
+    update only restores that background and blits the lines. A full draw
+    happens only when the axis limits or the canvas size change.
+
+    Long channels are reduced to min/max pairs per horizontal pixel of the
+    visible x-range, and reduced again when the x-range changes, so the
+    cost of a redraw does not grow with the buffer size.
+    """
+    colors = ['brown', 'red', 'orange', 'blue']
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -13,30 +28,119 @@ class MatplotlibWidget(QWidget):
 
         # The main axes for plotting
         self.axes = self.figure.add_subplot(111)
+        self.lines = []
+        self.data = None # (channels x points) view of the last plotted buffer
+        self.autoscale_y = True
+        self._background = None
+        self._background_key = None
+        self._setup_axes()
+        self.axes.callbacks.connect('xlim_changed', self._on_xlim_changed)
 
         # Set up the layout
         layout = QVBoxLayout()
         layout.addWidget(self.canvas)
         self.setLayout(layout)
 
+    def _setup_axes(self):
+        self.axes.grid(True, which='both', linestyle='--', linewidth=0.5)
+        self.axes.set_title("Memory Buffer Data")
+        self.axes.set_xlabel("Address")
+        self.axes.set_ylabel("Value")
+
     def plot_data(self, data_buffer, num_channels=4, points_per_channel=1024):
-        """Clears the current plot and plots new data from the buffer."""
-        self.axes.clear()
+        """Updates the plot with new data from the buffer.
 
-        colors = ['brown', 'red', 'orange', 'blue']
+        The widget keeps a reference to the data to decimate it again on
+        zoom, so pass the buffer again after changing it.
+        """
+        count = min(num_channels * points_per_channel, len(data_buffer)) // points_per_channel * points_per_channel
+        new_shape = (count // points_per_channel, points_per_channel)
+        rebuild = self.data is None or self.data.shape != new_shape or len(self.lines) != new_shape[0]
+        self.data = np.asarray(data_buffer[:count], dtype=float).reshape(new_shape)
+        if rebuild:
+            self._create_lines()
+        visible = self._update_lines()
 
-        for i in range(num_channels):
-            start_index = i * points_per_channel
-            end_index = start_index + points_per_channel
-            channel_data = data_buffer[start_index:end_index]
-            
-            # Create x-axis values (0, 1, 2, ...)
-            x_values = range(len(channel_data))
+        if self.autoscale_y:
+            self._autoscale(visible)
+        self.redraw()
 
-            self.axes.plot(x_values, channel_data, color=colors[i % len(colors)], linewidth=1)
+    def _create_lines(self):
+        for line in self.lines:
+            line.remove()
+        self.lines = []
+        for i in range(len(self.data)):
+            line, = self.axes.plot([], [], color=self.colors[i % len(self.colors)], linewidth=1)
+            self.lines.append(line)
+        points = self.data.shape[1]
+        if points > 1:
+            self.axes.set_xlim(0, points - 1)
 
-        self.axes.grid(True, which='both', linestyle='--', linewidth=0.5)
-        self.axes.set_title("Memory Buffer Data")
-        self.axes.set_xlabel("Address")
-        self.axes.set_ylabel("Value")
+    def _update_lines(self):
+        """Decimate the visible x-range into the lines and return the plotted y-data."""
+        x_min, x_max = self.axes.get_xlim()
+        pixels = max(1, int(self.axes.bbox.width))
+        x, y = minmax_decimate(self.data, math.floor(x_min), math.ceil(x_max) + 1, pixels)
+        for line, channel_data in zip(self.lines, y):
+            line.set_data(x, channel_data)
+        return y
+
+    def _on_xlim_changed(self, axes):
+        # Toolbar zoom/pan: re-decimate for the new range before it is drawn
+        if self.data is not None and self.lines:
+            self._update_lines()
+
+    def _autoscale(self, channels, force=False):
+        """Change the y-limits only if the data no longer fits them well."""
+        finite = [ch[np.isfinite(ch)] for ch in channels if len(ch)]
+        finite = [ch for ch in finite if ch.size]
+        if not finite:
+            return
+        data_min = min(ch.min() for ch in finite)
+        data_max = max(ch.max() for ch in finite)
+        span = data_max - data_min
+        lower, upper = self.axes.get_ylim()
+        # Keep the current limits while the data fills at least half of them
+        if not force and lower <= data_min and data_max <= upper and span >= 0.5 * (upper - lower):
+            return
+        margin = span * 0.05 if span > 0 else max(abs(data_max) * 0.05, 0.5)
+        self.axes.set_ylim(data_min - margin, data_max + margin)
+
+    # The methods below only change state; call redraw() to show it
+
+    def set_y_limits(self, y_min, y_max):
+        """Fix the y-axis range and turn autoscaling off."""
+        self.autoscale_y = False
+        self.axes.set_ylim(y_min, y_max)
+
+    def enable_autoscale(self):
+        self.autoscale_y = True
+        if self.lines:
+            self._autoscale([line.get_ydata() for line in self.lines], force=True)
+
+    def clear_plot(self):
+        for line in self.lines:
+            line.remove()
+        self.lines = []
+        self.data = None
+        self._background = None
+
+    def redraw(self):
+        """Blit the lines over the cached background, redrawing it if stale."""
+        key = (self.axes.get_xlim(), self.axes.get_ylim(), self.canvas.get_width_height())
+        if self._background is None or key != self._background_key:
+            self._draw_background()
+            self._background_key = key
+        self.canvas.restore_region(self._background)
+        for line in self.lines:
+            self.axes.draw_artist(line)
+        self.canvas.blit(self.axes.bbox)
+
+    def _draw_background(self):
+        # Render everything except the lines and keep it for later updates
+        for line in self.lines:
+            line.set_visible(False)
         self.canvas.draw()
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        for line in self.lines:
+            line.set_visible(True)
@@ -0,0 +1,279 @@
+import math
+import numpy as np
+import shiboken6
+from PySide6.QtCore import Qt, QPointF, QRectF
+from PySide6.QtGui import QPainter, QPen, QColor, QPolygonF, QFontMetrics
+from PySide6.QtWidgets import QWidget
+from utils.decimation import minmax_decimate
+
+def nice_ticks(lower, upper, max_ticks=8):
+    """Return tick positions at 1/2/5 x 10^n steps inside [lower, upper]."""
+    span = upper - lower
+    if not (span > 0 and math.isfinite(span)):
+        return []
+    raw_step = span / max_ticks
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    first = math.ceil(lower / step) * step
+    return list(np.arange(first, upper + step * 1e-9, step))
+
+def polygon_view(polygon, count):
+    """Resize polygon to count points and return its memory as a (count, 2) float array."""
+    polygon.resize(count)
+    if count == 0:
+        return np.empty((0, 2))
+    pointer = shiboken6.VoidPtr(polygon.data(), count * 16, True)
+    return np.frombuffer(pointer, dtype=np.float64).reshape(count, 2)
+
+class QtPlotWidget(QWidget):
+    """A lightweight multi-channel line plot painted directly with QPainter.
+
+    Offers the same plot_data/set_y_limits/enable_autoscale/clear_plot/redraw
+    interface as MatplotlibWidget. Each channel is a QPolygonF whose memory
+    is filled with pixel coordinates by numpy, so a frame costs one vector
+    transform and one drawPolyline per channel. The visible range is reduced
+    to min/max pairs per pixel first, so large buffers cost no more to draw.
+
+    Mouse: wheel zooms the x-axis around the cursor (Shift+wheel: y-axis),
+    left-drag pans, double-click resets the view, hovering shows the values
+    under the cursor.
+    """
+    colors = ['brown', 'red', 'orange', 'blue']
+    margins = (60, 30, 15, 40) # left, top, right, bottom
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title = "Memory Buffer Data"
+        self.xlabel = "Address"
+        self.ylabel = "Value"
+        self.autoscale_y = True
+        self.data = None # (channels x points) view of the last plotted buffer
+        self.x_range = None # None shows all points
+        self.y_range = (0.0, 1.0)
+        self._polygons = []
+        self._views = []
+        self._pens = []
+        self._hover_pos = None
+        self._drag_start = None
+        self.setMouseTracking(True)
+        self.setMinimumSize(200, 150)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    # --- Data interface (same as MatplotlibWidget) ---
+    def plot_data(self, data_buffer, num_channels=4, points_per_channel=1024):
+        """Updates the plot with new data from the buffer.
+
+        The widget keeps a reference to the data and reads it when painting,
+        so pass the buffer again after changing it.
+        """
+        count = min(num_channels * points_per_channel, len(data_buffer)) // points_per_channel * points_per_channel
+        channels = np.asarray(data_buffer[:count], dtype=float).reshape(-1, points_per_channel)
+        if self.data is None or len(self.data) != len(channels):
+            self._create_polygons(len(channels))
+        self.data = channels
+        if self.autoscale_y:
+            self._autoscale()
+        self.redraw()
+
+    def _create_polygons(self, num_channels):
+        # Polygons grow on demand to the decimated point count, not the buffer size
+        self._polygons = [QPolygonF() for _ in range(num_channels)]
+        self._views = [polygon_view(polygon, 0) for polygon in self._polygons]
+        self._pens = [QPen(QColor(self.colors[i % len(self.colors)]), 1) for i in range(num_channels)]
+        for pen in self._pens:
+            pen.setCosmetic(True)
+
+    def _autoscale(self, force=False):
+        """Change the y-limits only if the data no longer fits them well."""
+        if self.data is None or not self.data.size:
+            return
+        # The decimated visible range has the same extremes as the raw data
+        x0, x1 = self.current_x_range()
+        _, visible = minmax_decimate(self.data, math.floor(x0), math.ceil(x1) + 1, self.plot_rect().width())
+        finite = visible[np.isfinite(visible)]
+        if not finite.size:
+            return
+        data_min, data_max = finite.min(), finite.max()
+        span = data_max - data_min
+        lower, upper = self.y_range
+        # Keep the current limits while the data fills at least half of them
+        if not force and lower <= data_min and data_max <= upper and span >= 0.5 * (upper - lower):
+            return
+        margin = span * 0.05 if span > 0 else max(abs(data_max) * 0.05, 0.5)
+        self.y_range = (float(data_min - margin), float(data_max + margin))
+
+    # The methods below only change state; call redraw() to show it
+
+    def set_y_limits(self, y_min, y_max):
+        """Fix the y-axis range and turn autoscaling off."""
+        self.autoscale_y = False
+        if y_max > y_min:
+            self.y_range = (float(y_min), float(y_max))
+
+    def enable_autoscale(self):
+        self.autoscale_y = True
+        self._autoscale(force=True)
+
+    def clear_plot(self):
+        self.data = None
+        self._polygons = []
+        self._views = []
+        self._pens = []
+
+    def redraw(self):
+        self.update()
+
+    # --- Coordinates ---
+    def plot_rect(self):
+        left, top, right, bottom = self.margins
+        return QRectF(left, top, max(1, self.width() - left - right), max(1, self.height() - top - bottom))
+
+    def current_x_range(self):
+        if self.x_range is not None:
+            return self.x_range
+        points = self.data.shape[1] if self.data is not None else 1
+        return (0.0, float(max(points - 1, 1)))
+
+    def _scales(self, rect):
+        """Return (sx, bx, sy, by) so that pixel = value * s + b."""
+        x0, x1 = self.current_x_range()
+        y0, y1 = self.y_range
+        sx = rect.width() / (x1 - x0)
+        sy = -rect.height() / (y1 - y0)
+        return sx, rect.left() - x0 * sx, sy, rect.bottom() - y0 * sy
+
+    # --- Painting ---
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        rect = self.plot_rect()
+        sx, bx, sy, by = self._scales(rect)
+        self._paint_axes(painter, rect, sx, bx, sy, by)
+
+        if self.data is not None:
+            painter.save()
+            painter.setClipRect(rect)
+            x0, x1 = self.current_x_range()
+            x, y = minmax_decimate(self.data, math.floor(x0), math.ceil(x1) + 1, rect.width())
+            count = len(x)
+            # x pixel positions are the same for every channel
+            xs = x * sx + bx
+            if count >= 2 and self._views and len(self._views[0]) < count:
+                self._views = [polygon_view(polygon, count) for polygon in self._polygons]
+            for channel, polygon, view, pen in zip(y, self._polygons, self._views, self._pens):
+                if count < 2:
+                    break
+                view[:count, 0] = xs
+                np.multiply(channel, sy, out=view[:count, 1])
+                view[:count, 1] += by
+                # Keep coordinates in a range the rasterizer handles well
+                np.clip(view[:count, 1], -1e6, 1e6, out=view[:count, 1])
+                painter.setPen(pen)
+                painter.drawPolyline(polygon if count == len(view) else polygon.mid(0, count))
+            painter.restore()
+
+        self._paint_hover(painter, rect, sx, bx)
+        painter.end()
+
+    def _paint_axes(self, painter, rect, sx, bx, sy, by):
+        metrics = QFontMetrics(painter.font())
+        grid_pen = QPen(QColor(200, 200, 200), 1, Qt.DashLine)
+        text_pen = QPen(Qt.black)
+        x0, x1 = self.current_x_range()
+        y0, y1 = self.y_range
+
+        for x in nice_ticks(x0, x1, max(2, int(rect.width() / 80))):
+            px = x * sx + bx
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(px, rect.top()), QPointF(px, rect.bottom()))
+            painter.setPen(text_pen)
+            label = f"{x:g}"
+            painter.drawText(QPointF(px - metrics.horizontalAdvance(label) / 2, rect.bottom() + metrics.ascent() + 3), label)
+        for y in nice_ticks(y0, y1, max(2, int(rect.height() / 40))):
+            py = y * sy + by
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(rect.left(), py), QPointF(rect.right(), py))
+            painter.setPen(text_pen)
+            label = f"{y:g}"
+            painter.drawText(QPointF(rect.left() - metrics.horizontalAdvance(label) - 4, py + metrics.ascent() / 2 - 1), label)
+
+        painter.setPen(text_pen)
+        painter.drawRect(rect)
+        painter.drawText(QRectF(rect.left(), 0, rect.width(), rect.top()), Qt.AlignCenter, self.title)
+        painter.drawText(QRectF(rect.left(), rect.bottom() + metrics.height() + 2, rect.width(), metrics.height() + 4),
+                         Qt.AlignCenter, self.xlabel)
+        painter.save()
+        painter.translate(metrics.height() / 2 + 2, rect.center().y())
+        painter.rotate(-90)
+        painter.drawText(QRectF(-rect.height() / 2, -metrics.height() / 2, rect.height(), metrics.height()), Qt.AlignCenter, self.ylabel)
+        painter.restore()
+
+    def _paint_hover(self, painter, rect, sx, bx):
+        if self._hover_pos is None or self.data is None or not rect.contains(self._hover_pos):
+            return
+        index = int(round((self._hover_pos.x() - bx) / sx))
+        if not 0 <= index < self.data.shape[1]:
+            return
+        px = index * sx + bx
+        painter.setPen(QPen(QColor(80, 80, 80), 1, Qt.DotLine))
+        painter.drawLine(QPointF(px, rect.top()), QPointF(px, rect.bottom()))
+
+        lines = [f"X: {index}"] + [f"Ch{i + 1}: {value:g}" for i, value in enumerate(self.data[:, index])]
+        metrics = QFontMetrics(painter.font())
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 10
+        height = metrics.height() * len(lines) + 6
+        box_x = px + 10 if px + 10 + width < rect.right() else px - 10 - width
+        box = QRectF(box_x, rect.top() + 5, width, height)
+        painter.setPen(QPen(Qt.black))
+        painter.setBrush(QColor(255, 255, 255, 220))
+        painter.drawRect(box)
+        for i, line in enumerate(lines):
+            if i:
+                painter.setPen(QColor(self.colors[(i - 1) % len(self.colors)]))
+            painter.drawText(QPointF(box.left() + 5, box.top() + 3 + metrics.ascent() + i * metrics.height()), line)
+
+    # --- Zoom, pan and hover ---
+    def wheelEvent(self, event):
+        rect = self.plot_rect()
+        sx, bx, sy, by = self._scales(rect)
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        pos = event.position()
+        if event.modifiers() & Qt.ShiftModifier:
+            center = (pos.y() - by) / sy
+            y0, y1 = self.y_range
+            self.y_range = (center + (y0 - center) * factor, center + (y1 - center) * factor)
+            self.autoscale_y = False
+        else:
+            center = (pos.x() - bx) / sx
+            x0, x1 = self.current_x_range()
+            self.x_range = (center + (x0 - center) * factor, center + (x1 - center) * factor)
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_start = (event.position(), self.current_x_range(), self.y_range)
+
+    def mouseMoveEvent(self, event):
+        self._hover_pos = event.position()
+        if self._drag_start is not None:
+            start, (x0, x1), (y0, y1) = self._drag_start
+            rect = self.plot_rect()
+            dx = (event.position().x() - start.x()) * (x1 - x0) / rect.width()
+            dy = (event.position().y() - start.y()) * (y1 - y0) / rect.height()
+            self.x_range = (x0 - dx, x1 - dx)
+            if dy:
+                self.y_range = (y0 + dy, y1 + dy)
+                self.autoscale_y = False
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        self._drag_start = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.x_range = None
+        self.enable_autoscale()
+        self.update()
+
+    def leaveEvent(self, event):
+        self._hover_pos = None
+        self.update()
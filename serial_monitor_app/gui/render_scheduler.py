@@ -0,0 +1,78 @@
+import time
+from PySide6.QtCore import QObject, QTimer, QEvent
+
+class RenderScheduler(QObject):
+    """Renders registered plot windows at no more than max_fps.
+
+    Windows call mark_dirty() instead of drawing; the scheduler later calls
+    their apply_and_redraw() once, so any number of updates between two
+    frames end in a single render of the latest state. Hidden or minimized
+    windows stay dirty and are rendered when they are shown again.
+    """
+    _instance = None
+
+    def __init__(self, max_fps=30, parent=None):
+        super().__init__(parent)
+        self.windows = []
+        self.frames_rendered = 0
+        # Updates that were replaced by a newer one before being rendered
+        self.frames_dropped = 0
+        self._dirty = {}
+        self._last_frame = 0.0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._render)
+        self.set_max_fps(max_fps)
+
+    @classmethod
+    def instance(cls):
+        """Return the shared scheduler, creating it on first use."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def set_max_fps(self, max_fps):
+        self.max_fps = max(1, int(max_fps))
+        self.frame_interval = 1.0 / self.max_fps
+
+    def register(self, window):
+        if window not in self.windows:
+            self.windows.append(window)
+            window.installEventFilter(self)
+
+    def unregister(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+            window.removeEventFilter(self)
+        self._dirty.pop(window, None)
+
+    def mark_dirty(self, window):
+        if window in self._dirty:
+            self.frames_dropped += 1
+        else:
+            self._dirty[window] = True
+        self._schedule()
+
+    def _schedule(self):
+        if self.timer.isActive() or not any(self._can_render(w) for w in self._dirty):
+            return
+        wait = self._last_frame + self.frame_interval - time.monotonic()
+        self.timer.start(max(0, int(wait * 1000)))
+
+    def _can_render(self, window):
+        return window.isVisible() and not window.isMinimized()
+
+    def _render(self):
+        self._last_frame = time.monotonic()
+        for window in list(self._dirty):
+            if not self._can_render(window):
+                continue
+            del self._dirty[window]
+            window.apply_and_redraw()
+            self.frames_rendered += 1
+
+    def eventFilter(self, obj, event):
+        # Catch up on updates a window missed while hidden or minimized
+        if event.type() in (QEvent.Show, QEvent.WindowStateChange) and obj in self._dirty:
+            self._schedule()
+        return False
@@ -0,0 +1,162 @@
+import numpy as np
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QListWidget,
+    QListWidgetItem, QPushButton, QSplitter
+)
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
+from matplotlib.figure import Figure
+from .render_scheduler import RenderScheduler
+from utils.decimation import minmax_decimate
+from utils.timestamps import now_ns
+
+class TrendWindow(QMainWindow):
+    """Plots the recorded history of selected PI values over time.
+
+    The samples come from a PIHistory; this window only reads it when it is
+    rendered. Each selected channel is cut to the chosen time span with a
+    binary search on its stamps and reduced to min/max pairs per pixel, so a
+    frame costs the same however long the history is. Redraws go through
+    the RenderScheduler and only happen while the window is visible.
+    """
+    # (label, seconds); None shows the whole history
+    spans = [("10 s", 10), ("1 min", 60), ("10 min", 600), ("1 h", 3600), ("All", None)]
+
+    def __init__(self, history, labels=None, parent=None, scheduler=None):
+        super().__init__(parent)
+        self.setWindowTitle("PI Trend")
+        self.setGeometry(250, 250, 900, 550)
+        self.history = history
+        self.lines = {}
+        self.selected = set()
+
+        central_widget = QWidget()
+        main_layout = QVBoxLayout(central_widget)
+        self.setCentralWidget(central_widget)
+
+        # --- Span and selection controls ---
+        controls_layout = QHBoxLayout()
+        self.span_combo = QComboBox()
+        for text, seconds in self.spans:
+            self.span_combo.addItem(text, seconds)
+        self.span_combo.setCurrentIndex(1)
+        clear_selection_button = QPushButton("Clear Selection")
+        controls_layout.addWidget(QLabel("Time span:"))
+        controls_layout.addWidget(self.span_combo)
+        controls_layout.addStretch(1)
+        controls_layout.addWidget(clear_selection_button)
+        main_layout.addLayout(controls_layout)
+
+        # --- Channel list and plot ---
+        splitter = QSplitter(Qt.Horizontal)
+        self.channel_list = QListWidget()
+        for i in range(history.num_channels):
+            text = labels[i] if labels and i < len(labels) else f"Value {i + 1}"
+            item = QListWidgetItem(text.rstrip(':'))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.channel_list.addItem(item)
+        splitter.addWidget(self.channel_list)
+
+        plot_widget = QWidget()
+        plot_layout = QVBoxLayout(plot_widget)
+        plot_layout.setContentsMargins(0, 0, 0, 0)
+        self.figure = Figure(figsize=(6, 4), dpi=100)
+        self.canvas = FigureCanvas(self.figure)
+        self.axes = self.figure.add_subplot(111)
+        self.axes.grid(True, linestyle='--', linewidth=0.5)
+        self.axes.set_xlabel("Time (s, 0 = now)")
+        self.axes.set_ylabel("Value")
+        plot_layout.addWidget(NavigationToolbar2QT(self.canvas, self))
+        plot_layout.addWidget(self.canvas, 1)
+        splitter.addWidget(plot_widget)
+        splitter.setStretchFactor(1, 1)
+        splitter.setSizes([170, 730])
+        main_layout.addWidget(splitter, 1)
+
+        # --- Connect signals ---
+        self.channel_list.itemChanged.connect(self.on_item_changed)
+        self.span_combo.currentIndexChanged.connect(self.request_redraw)
+        clear_selection_button.clicked.connect(self.clear_selection)
+
+        # The time axis keeps moving even when no new values arrive
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setInterval(1000)
+        self.tick_timer.timeout.connect(self.request_redraw)
+
+        self.scheduler = scheduler or RenderScheduler.instance()
+        self.scheduler.register(self)
+
+    # --- Selection ---
+    def set_labels(self, labels):
+        for i, text in enumerate(labels[:self.channel_list.count()]):
+            self.channel_list.item(i).setText(text.rstrip(':'))
+
+    def on_item_changed(self, item):
+        channel = self.channel_list.row(item)
+        checked = item.checkState() == Qt.Checked
+        if checked and channel not in self.selected:
+            self.selected.add(channel)
+            line, = self.axes.plot([], [], linewidth=1, label=item.text())
+            self.lines[channel] = line
+        elif not checked and channel in self.selected:
+            self.selected.discard(channel)
+            self.lines.pop(channel).remove()
+        elif checked:
+            # Only the label changed
+            self.lines[channel].set_label(item.text())
+        self._update_legend()
+        self.request_redraw()
+
+    def clear_selection(self):
+        for i in range(self.channel_list.count()):
+            self.channel_list.item(i).setCheckState(Qt.Unchecked)
+
+    def _update_legend(self):
+        legend = self.axes.get_legend()
+        if legend is not None:
+            legend.remove()
+        if self.lines:
+            self.axes.legend(loc='upper left', fontsize='small')
+
+    # --- Updates ---
+    def on_pi_updated(self, index, value, stamp_ns):
+        """Slot for pi_data_updated; the value itself is read from the history."""
+        if index in self.selected:
+            self.request_redraw()
+
+    def request_redraw(self):
+        self.scheduler.mark_dirty(self)
+
+    def apply_and_redraw(self):
+        """Called by the scheduler: cut, decimate and draw the selected channels."""
+        now = now_ns()
+        seconds = self.span_combo.currentData()
+        since = now - int(seconds * 1e9) if seconds is not None else None
+        pixels = max(1, int(self.axes.bbox.width))
+        oldest = 0.0
+        for channel, line in self.lines.items():
+            stamps, values = self.history.series(channel, since)
+            if not len(values):
+                line.set_data([], [])
+                continue
+            x, y = minmax_decimate(values[np.newaxis, :], 0, len(values), pixels)
+            times = (stamps[x] - now) / 1e9
+            line.set_data(times, y[0])
+            oldest = min(oldest, times[0])
+
+        self.axes.set_xlim(-seconds if seconds is not None else min(oldest, -1.0), 0)
+        self.axes.relim()
+        self.axes.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
+
+    # --- Visibility ---
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.tick_timer.start()
+        self.request_redraw()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.tick_timer.stop()
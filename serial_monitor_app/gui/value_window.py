@@ -2,13 +2,23 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QScrollArea, QLabel, QLineEdit, 
     QGroupBox
 )
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtCore import Qt, QEvent, QTimer
 from PySide6.QtGui import QFont
 
 class ValueWindow(QWidget):
-    """A separate window to display PI values and handle logging."""
-    def __init__(self, parent=None):
+    """A separate window to display PI values and handle logging.
+
+    The values themselves live in a ValueStore; update_value only marks a
+    cell. A display tick then writes the cells that changed since the last
+    tick, and only while the window is visible, so fast polling does not
+    cost a setText and repaint per message.
+    """
+    # Delay between a value arriving and it being shown
+    display_interval_ms = 100
+
+    def __init__(self, store, parent=None):
         super().__init__(parent)
+        self.store = store
         self.setWindowTitle("PI Values Display")
         self.setWindowFlags(self.windowFlags() | Qt.Window)
 
@@ -16,6 +26,12 @@ class ValueWindow(QWidget):
         self.value_labels = {}
         self.value_line_edits = {}
         self.current_font_size = 10
+        # Indexes updated in the store but not shown yet
+        self.dirty = set()
+        self.display_timer = QTimer(self)
+        self.display_timer.setSingleShot(True)
+        self.display_timer.setInterval(self.display_interval_ms)
+        self.display_timer.timeout.connect(self.refresh_display)
 
         # --- Main Layout ---
         main_layout = QVBoxLayout(self)
@@ -39,8 +55,7 @@ class ValueWindow(QWidget):
         for i in range(num_items):
             row = i % num_rows
             col = i // num_rows
-            num = i + 1
-            label = QLabel(f"Value {num}:")
+            label = QLabel(self.store.labels[i])
             line_edit = QLineEdit()
             line_edit.setReadOnly(True)
             label.setFont(initial_font)
@@ -81,22 +96,34 @@ class ValueWindow(QWidget):
             self.value_line_edits[i].setFont(font)
 
     def update_value(self, index, value):
-        """Slot to update a specific value in the grid."""
-        if index in self.value_line_edits:
-            self.value_line_edits[index].setText(str(value))
+        """Slot to update a specific value; it is shown on the next display tick."""
+        if index not in self.value_line_edits:
+            return
+        self.dirty.add(index)
+        if self.isVisible() and not self.display_timer.isActive():
+            self.display_timer.start()
+
+    def refresh_display(self):
+        """Write the changed values into their cells."""
+        if not self.isVisible():
+            return
+        indices = list(self.dirty)
+        for index, text in zip(indices, self.store.raw_values(indices)):
+            line_edit = self.value_line_edits[index]
+            if line_edit.text() != text:
+                line_edit.setText(text)
+        self.dirty.clear()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Catch up on everything that arrived while hidden
+        self.refresh_display()
 
     def closeEvent(self, event):
         """Handle window close event."""
         super().closeEvent(event)
 
-    def get_all_labels(self):
-        return [self.value_labels[i].text() for i in range(60)]
-
-    def get_all_values(self):
-        return [self.value_line_edits[i].text() for i in range(60)]
-
-    def get_right_column_labels(self):
-        return [self.value_labels[i].text() for i in range(45, 60)]
-
-    def get_right_column_values(self):
-        return [self.value_line_edits[i].text() for i in range(45, 60)]
\ No newline at end of file
+    def set_label(self, index, text):
+        if index in self.value_labels:
+            self.value_labels[index].setText(text)
+            self.store.set_label(index, text)
@@ -0,0 +1,139 @@
+import struct
+import time
+import zlib
+import numpy as np
+
+# Binary dump frame layout (little-endian):
+#   magic      4 bytes  b'\xa5\x5aWF' (never valid in the ASCII protocol)
+#   buf_type   2 bytes  b'MB' or b'BK'
+#   dtype      1 byte   key of DTYPE_CODES
+#   reserved   1 byte
+#   count      uint32   number of samples
+#   samples    count * itemsize bytes
+#   checksum   uint32   CRC-32 of header + samples
+MAGIC = b'\xa5\x5aWF'
+HEADER = struct.Struct('<4s2sBBI')
+CHECKSUM = struct.Struct('<I')
+DTYPE_CODES = {
+    1: np.dtype('<i2'),
+    2: np.dtype('<u2'),
+    3: np.dtype('<i4'),
+    4: np.dtype('<f4'),
+    5: np.dtype('<f8'),
+}
+BUFFER_TYPES = (b'MB', b'BK')
+# Upper bound used to reject corrupt headers instead of waiting for gigabytes
+MAX_SAMPLES = 1 << 22
+# Seconds an incomplete frame may block the stream before it is given up
+FRAME_TIMEOUT = 5.0
+
+def encode_frame(buf_type, samples, dtype_code=1):
+    """Build a binary dump frame, e.g. encode_frame("MB", data)."""
+    dtype = DTYPE_CODES[dtype_code]
+    payload = np.ascontiguousarray(samples, dtype=dtype).tobytes()
+    header = HEADER.pack(MAGIC, buf_type.encode('ascii'), dtype_code, 0, len(payload) // dtype.itemsize)
+    return header + payload + CHECKSUM.pack(zlib.crc32(header + payload))
+
+def frame_length(header_bytes, limits=None):
+    """Return the total frame length for a header, or None if the header is invalid.
+
+    limits optionally maps "MB"/"BK" to the largest sample count accepted
+    for that buffer type; MAX_SAMPLES applies otherwise.
+    """
+    magic, buf_type, dtype_code, _, count = HEADER.unpack_from(header_bytes)
+    if magic != MAGIC or buf_type not in BUFFER_TYPES or dtype_code not in DTYPE_CODES:
+        return None
+    limit = limits.get(buf_type.decode('ascii'), MAX_SAMPLES) if limits else MAX_SAMPLES
+    if count > min(limit, MAX_SAMPLES):
+        return None
+    return HEADER.size + count * DTYPE_CODES[dtype_code].itemsize + CHECKSUM.size
+
+def decode_frame(frame):
+    """Validate a complete frame and return (buf_type, samples).
+
+    samples is a read-only np.frombuffer view over the frame bytes; no copy
+    is made until the caller assigns it into its own buffer.
+    """
+    total = frame_length(frame)
+    if total is None or total != len(frame):
+        raise ValueError("invalid frame header")
+    _, buf_type, dtype_code, _, count = HEADER.unpack_from(frame)
+    view = memoryview(frame)
+    body_end = total - CHECKSUM.size
+    (checksum,) = CHECKSUM.unpack_from(view, body_end)
+    if zlib.crc32(view[:body_end]) != checksum:
+        raise ValueError(f"checksum mismatch in {buf_type.decode('ascii')} frame")
+    samples = np.frombuffer(view, dtype=DTYPE_CODES[dtype_code], count=count, offset=HEADER.size)
+    return buf_type.decode('ascii'), samples
+
+class StreamSplitter:
+    """Splits a raw byte stream into text lines and binary dump frames.
+
+    A damaged header can announce far more samples than will ever arrive,
+    which would hold back all text behind it. limits (see frame_length)
+    rejects counts larger than the buffers, and a frame still incomplete
+    after frame_timeout seconds is dropped: the search for the next frame
+    restarts behind its magic and the bytes in between come out as text.
+    limits is only read, so its owner can update it while the stream runs.
+    """
+
+    def __init__(self, limits=None, frame_timeout=FRAME_TIMEOUT):
+        self.pending = b''
+        self.limits = limits
+        self.frame_timeout_ns = int(frame_timeout * 1e9)
+        # Receive stamp of the chunk in which the incomplete frame started
+        self._waiting_since = None
+
+    def feed(self, chunk, stamp_ns=None):
+        """Append received bytes and return what is now complete, in stream order.
+
+        Text lines are returned as str and binary frames as bytes. stamp_ns
+        is the receive time of chunk (monotonic ns, default now).
+        """
+        if stamp_ns is None:
+            stamp_ns = time.monotonic_ns()
+        items = []
+        data = self.pending + chunk
+        pos = 0
+        while True:
+            start = data.find(MAGIC, pos)
+            if start < 0:
+                # Text only: keep the unterminated tail for the next chunk
+                end = data.rfind(b'\n', pos)
+                if end >= 0:
+                    self._split_lines(data[pos:end], items)
+                    pos = end + 1
+                break
+            if start > pos:
+                # Text received before the frame, including an unterminated last line
+                self._split_lines(data[pos:start], items)
+                pos = start
+            if len(data) - start < HEADER.size:
+                total = None
+            else:
+                total = frame_length(data[start:start + HEADER.size], self.limits)
+                if total is None:
+                    # Corrupt header: skip the magic and resynchronise
+                    pos = start + 1
+                    continue
+            if total is None or len(data) - start < total:
+                if self._waiting_since is None:
+                    self._waiting_since = stamp_ns
+                elif stamp_ns - self._waiting_since >= self.frame_timeout_ns:
+                    # Timed out: treat the frame like a corrupt header
+                    self._waiting_since = None
+                    pos = start + 1
+                    continue
+                break
+            items.append(data[start:start + total])
+            pos = start + total
+            self._waiting_since = None
+        self.pending = data[pos:]
+        return items
+
+    @staticmethod
+    def _split_lines(text, items):
+        for raw in text.split(b'\n'):
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line:
+                items.append(line)
@@ -0,0 +1,189 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import time
+import numpy as np
+from utils.log_writer import LogWriter
+from utils.timestamps import to_wall_ns
+
+# Binary log file (.smlog), chunked and columnar:
+#   file header  magic b'SMLOG\x00\x01\x00', uint32 JSON length, uint32 reserved,
+#                JSON {"columns": [[name, dtype], ..], "labels": [..], "wall_offset_ns": ..}
+#                padded to a multiple of 8 bytes
+#   chunks       magic b'CHNK', uint32 row count, then every column of the chunk
+#                as one contiguous array, each padded to a multiple of 8 bytes
+# The first column is the monotonic receive stamp in ns; wall_offset_ns turns
+# it into wall-clock time. A chunk cut short by a crash is ignored on load.
+#
+# Convert to CSV from the serial_monitor_app folder:
+#     python -m utils.binary_log log_20250101_120000.smlog
+MAGIC = b'SMLOG\x00\x01\x00'
+FILE_HEADER = struct.Struct('<8sII')
+CHUNK_HEADER = struct.Struct('<4sI')
+CHUNK_MAGIC = b'CHNK'
+EXTENSION = '.smlog'
+
+def _padding(size):
+    return -size % 8
+
+class BinaryLogWriter(LogWriter):
+    """A LogWriter that stores rows in the chunked columnar .smlog format.
+
+    columns is a list of (name, dtype) and format_row must turn a queued row
+    into a tuple with one value per column. Rows are gathered and written as
+    one chunk when chunk_rows are waiting, chunk_interval seconds have passed
+    or the writer is closed, so small rates do not produce tiny chunks.
+    rotation takes the segment arguments of LogWriter (max_bytes, ...).
+    """
+
+    def __init__(self, path, columns, labels=None, format_row=None, flush_interval=1.0,
+                 fsync_interval=10.0, chunk_rows=4096, chunk_interval=10.0, **rotation):
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        self.labels = list(labels or [])
+        self.chunk_rows = chunk_rows
+        self.chunk_interval = chunk_interval
+        self.chunks_written = 0
+        # Field names are positional; labels may repeat or be empty
+        self._row_dtype = np.dtype([(f"c{i}", dtype) for i, (_, dtype) in enumerate(self.columns)])
+        self._pending = []
+        self._last_chunk = time.monotonic()
+        super().__init__(path, None, format_row or tuple, flush_interval, fsync_interval, **rotation)
+
+    def _open(self, header):
+        self._file = open(self.path, 'wb')
+        meta = json.dumps({
+            "columns": [[name, dtype.str] for name, dtype in self.columns],
+            "labels": self.labels,
+            "wall_offset_ns": to_wall_ns(0),
+        }).encode('utf-8')
+        header = FILE_HEADER.pack(MAGIC, len(meta), 0) + meta + b'\x00' * _padding(len(meta))
+        self._file.write(header)
+        self.segment_bytes += len(header)
+
+    def _write_batch(self, rows):
+        self._pending.extend(rows)
+        if len(self._pending) >= self.chunk_rows:
+            self._write_chunk()
+
+    def _flush(self, final=False):
+        if self._pending and (final or time.monotonic() - self._last_chunk >= self.chunk_interval):
+            self._write_chunk()
+        self._file.flush()
+
+    def _write_chunk(self):
+        block = np.array(self._pending, dtype=self._row_dtype)
+        self._pending = []
+        parts = [CHUNK_HEADER.pack(CHUNK_MAGIC, len(block))]
+        for name in block.dtype.names:
+            data = np.ascontiguousarray(block[name]).tobytes()
+            parts.append(data)
+            parts.append(b'\x00' * _padding(len(data)))
+        data = b''.join(parts)
+        self._file.write(data)
+        self.segment_bytes += len(data)
+        self.chunks_written += 1
+        self._last_chunk = time.monotonic()
+
+class BinaryLogReader:
+    """Memory-mapped access to an .smlog file; nothing is parsed row by row."""
+
+    def __init__(self, path):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, meta_size, _ = FILE_HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{os.path.basename(path)} is not a binary log")
+        start = FILE_HEADER.size
+        meta = json.loads(bytes(self._map[start:start + meta_size]).decode('utf-8'))
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in meta["columns"]]
+        self.labels = meta.get("labels", [])
+        self.wall_offset_ns = meta.get("wall_offset_ns", 0)
+        # (offset of the first column, rows) of every complete chunk
+        self.chunks = []
+        offset = start + meta_size + _padding(meta_size)
+        row_bytes = [dtype.itemsize for _, dtype in self.columns]
+        while offset + CHUNK_HEADER.size <= len(self._map):
+            chunk_magic, rows = CHUNK_HEADER.unpack_from(self._map, offset)
+            size = sum(rows * n + _padding(rows * n) for n in row_bytes)
+            if chunk_magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + size > len(self._map):
+                break
+            self.chunks.append((offset + CHUNK_HEADER.size, rows))
+            offset += CHUNK_HEADER.size + size
+        # Byte offset of every column in every chunk (chunks x columns), so
+        # reading a column needs no walk over the chunks
+        rows = np.array([rows for _, rows in self.chunks], dtype=np.int64)
+        sizes = rows[:, None] * np.array(row_bytes, dtype=np.int64)
+        sizes += -sizes % 8
+        self._rows = rows
+        self._column_offsets = (np.array([offset for offset, _ in self.chunks], dtype=np.int64)[:, None]
+                                + np.cumsum(sizes, axis=1) - sizes)
+
+    def __len__(self):
+        return int(self._rows.sum())
+
+    @property
+    def names(self):
+        return [name for name, _ in self.columns]
+
+    def column(self, key):
+        """Return one column, by index or name, over all chunks."""
+        index = key if isinstance(key, int) else self.names.index(key)
+        dtype = self.columns[index][1]
+        starts = self._column_offsets[:, index]
+        if len(starts) == 1:
+            return self._map[starts[0]:starts[0] + self._rows[0] * dtype.itemsize].view(dtype)
+        if len(starts) == 0:
+            return np.empty(0, dtype=dtype)
+        if np.any(starts % dtype.itemsize):
+            return np.concatenate([self._map[start:start + rows * dtype.itemsize].view(dtype)
+                                   for start, rows in zip(starts.tolist(), self._rows.tolist())])
+        # Columns are 8-byte aligned: gather all chunks with one index array
+        # into the file viewed as this column's dtype
+        items = self._map[:len(self._map) // dtype.itemsize * dtype.itemsize].view(dtype)
+        first_row = np.cumsum(self._rows) - self._rows
+        positions = np.repeat(starts // dtype.itemsize - first_row, self._rows) + np.arange(len(self))
+        return items[positions]
+
+    def wall_stamps(self):
+        """Return the first column as nanoseconds since the epoch."""
+        return self.column(0).astype(np.int64) + self.wall_offset_ns
+
+    def close(self):
+        # The mapping itself is released once no returned column refers to it
+        self.chunks = []
+        self._rows = np.empty(0, dtype=np.int64)
+        self._column_offsets = np.empty((0, len(self.columns)), dtype=np.int64)
+        self._map = None
+
+def export_csv(path, csv_path=None):
+    """Convert an .smlog file to CSV and return the path of the CSV file."""
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + '.csv'
+    reader = BinaryLogReader(path)
+    try:
+        seconds, rem = np.divmod(reader.wall_stamps(), 1_000_000_000)
+        columns = [reader.column(i).tolist() for i in range(1, len(reader.columns))]
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp"] + reader.names[1:])
+            formatted = {}
+            for i, (second, micro) in enumerate(zip(seconds.tolist(), (rem // 1000).tolist())):
+                text = formatted.get(second)
+                if text is None:
+                    text = formatted[second] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+                writer.writerow([f"{text}.{micro:06d}"] + [column[i] for column in columns])
+    finally:
+        reader.close()
+    return csv_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a binary .smlog log file to CSV.")
+    parser.add_argument("path", help=".smlog file")
+    parser.add_argument("csv_path", nargs="?", help="output file (default: same name with .csv)")
+    args = parser.parse_args()
+    print(export_csv(args.path, args.csv_path))
+
+if __name__ == "__main__":
+    main()
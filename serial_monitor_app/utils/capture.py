@@ -0,0 +1,150 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import numpy as np
+from utils.timestamps import to_wall_ns
+
+# Capture file (.smcap), append-only:
+#   file header  magic b'SMCAP\x00\x01\x00', int64 wall-clock offset in ns
+#   records      int64 monotonic receive stamp in ns, uint32 length, raw bytes
+# Index file (.smcap.idx), one INDEX_DTYPE entry per record, so a time range
+# can be located with np.searchsorted on a memory-mapped array.
+MAGIC = b'SMCAP\x00\x01\x00'
+FILE_HEADER = struct.Struct('<8sq')
+RECORD_HEADER = struct.Struct('<qI')
+INDEX_DTYPE = np.dtype([('stamp_ns', '<i8'), ('offset', '<u8')])
+
+def index_path(path):
+    return path + '.idx'
+
+class CaptureWriter:
+    """Writes received chunks to a capture file from a background thread.
+
+    write() only queues the chunk, so it is safe to call from the serial
+    reader thread without blocking on disk I/O.
+    """
+    _STOP = object()
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self.bytes_written = 0
+        # Set if the writer thread hit an I/O error; later chunks are dropped
+        self.error = None
+        self._queue = queue.SimpleQueue()
+        self._data_file = open(path, 'wb')
+        self._index_file = open(index_path(path), 'wb')
+        self._data_file.write(FILE_HEADER.pack(MAGIC, to_wall_ns(0)))
+        self._offset = FILE_HEADER.size
+        self._thread = threading.Thread(target=self._run, name="CaptureWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, stamp_ns, data):
+        if self.error is None:
+            self._queue.put((stamp_ns, bytes(data)))
+
+    def close(self):
+        """Write everything still queued and close the files."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                items = [self._queue.get()]
+                # Drain whatever else is waiting and write it in one go
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = items[-1] is self._STOP
+                if stop:
+                    items.pop()
+                self._write_records(items)
+                if stop:
+                    break
+        except OSError as e:
+            self.error = e
+        finally:
+            self._data_file.close()
+            self._index_file.close()
+
+    def _write_records(self, items):
+        if not items:
+            return
+        index = np.empty(len(items), dtype=INDEX_DTYPE)
+        parts = []
+        for i, (stamp_ns, data) in enumerate(items):
+            index[i] = (stamp_ns, self._offset)
+            parts.append(RECORD_HEADER.pack(stamp_ns, len(data)))
+            parts.append(data)
+            self._offset += RECORD_HEADER.size + len(data)
+            self.bytes_written += len(data)
+        self._data_file.write(b''.join(parts))
+        self._data_file.flush()
+        # The index is written after its records so a reader never sees an
+        # entry pointing past the end of the data file
+        self._index_file.write(index.tobytes())
+        self._index_file.flush()
+        self.records += len(items)
+
+class CaptureReader:
+    """Read-only, memory-mapped access to a capture file and its index."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+        self._data = None
+        self._file = open(path, 'rb')
+        try:
+            if os.fstat(self._file.fileno()).st_size < FILE_HEADER.size:
+                raise ValueError(f"{os.path.basename(path)} is too short for a capture file")
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.wall_offset_ns = FILE_HEADER.unpack_from(self._data)
+            if magic != MAGIC:
+                raise ValueError(f"{os.path.basename(path)} is not a capture file")
+            entries = os.path.getsize(index_path(path)) // INDEX_DTYPE.itemsize
+            if entries:
+                self.index = np.memmap(index_path(path), dtype=INDEX_DTYPE, mode='r', shape=(entries,))
+        except Exception:
+            # Neither the file nor the mapping may outlive a failed open
+            self.close()
+            raise
+
+    def __len__(self):
+        return len(self.index)
+
+    def time_range(self):
+        """Return (first, last) receive stamps in ns, or None for an empty capture."""
+        if not len(self.index):
+            return None
+        return int(self.index['stamp_ns'][0]), int(self.index['stamp_ns'][-1])
+
+    def find(self, stamp_ns):
+        """Return the number of the first record received at or after stamp_ns."""
+        return int(np.searchsorted(self.index['stamp_ns'], stamp_ns, side='left'))
+
+    def record(self, i):
+        """Return (stamp_ns, payload bytes) for record i."""
+        offset = int(self.index['offset'][i])
+        stamp_ns, length = RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + RECORD_HEADER.size
+        return stamp_ns, self._data[start:start + length]
+
+    def records(self, start_ns=None, end_ns=None):
+        """Yield (stamp_ns, payload) for the records inside [start_ns, end_ns)."""
+        first = 0 if start_ns is None else self.find(start_ns)
+        last = len(self.index) if end_ns is None else self.find(end_ns)
+        for i in range(first, last):
+            yield self.record(i)
+
+    def close(self):
+        self.index = np.empty(0, dtype=INDEX_DTYPE)
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
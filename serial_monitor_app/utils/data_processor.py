@@ -1,27 +1,241 @@
 import numpy as np
 from PySide6.QtCore import QObject, Signal
+from utils.binary_dump import decode_frame
+from utils.geometry import BufferGeometry, DEFAULT_GEOMETRY
+from utils.ring_buffer import ChannelRingBuffer
+from utils.timestamps import now_ns
+
+class WaveformSnapshot:
+    """An immutable copy of a finished MB or BK dump.
+
+    Every dump gets a new snapshot with a higher version, so windows can
+    share it by reference and skip redraws for a version they have already
+    shown. data is a read-only numpy array laid out as described by
+    geometry.
+    """
+    __slots__ = ('buf_type', 'version', 'data', 'stamp_ns', 'geometry')
+
+    def __init__(self, buf_type, version, data, stamp_ns=None, geometry=None):
+        data.flags.writeable = False
+        self.buf_type = buf_type
+        self.version = version
+        self.data = data
+        self.stamp_ns = stamp_ns
+        self.geometry = geometry or DEFAULT_GEOMETRY[buf_type]
 
 class DataProcessor(QObject):
     """Parses incoming serial data and manages data buffers."""
-    # Signal(index, value)
-    pi_data_updated = Signal(int, str)
-    # Signal(numpy.ndarray) indicating the buffer has been updated and graph should be redrawn
+    # Signal(index, value, stamp_ns) where stamp_ns is the monotonic receive time
+    pi_data_updated = Signal(int, str, object)
+    # Signal(WaveformSnapshot) emitted when a dump is complete and graphs should be redrawn
     mem_data_updated = Signal(object)
     bk_data_updated = Signal(object)
-    # Signal for unrecognized data for logging
-    parsing_error = Signal(str)
+    # Signal(message, stamp_ns) for unrecognized data for logging
+    parsing_error = Signal(str, object)
+    # Signal(ChannelRingBuffer) after new MB/BK samples were streamed, at most once per batch
+    mem_stream_updated = Signal(object)
+    bk_stream_updated = Signal(object)
+    # Signal(BufferGeometry) when the device or a profile changes a buffer layout
+    geometry_changed = Signal(object)
 
-    def __init__(self, mem_size=5000, bk_size=5000):
+    def __init__(self, mem_geometry=None, bk_geometry=None, stream_length=None):
         super().__init__()
-        # Initialize data buffers similar to Mem_buf and BK_buf in VB code
-        self.mem_buf = np.zeros(mem_size, dtype=float)
-        self.bk_buf = np.zeros(bk_size, dtype=float)
-        # Buffers to store original data for gain/offset adjustments
-        self.mem_buf_original = np.zeros(mem_size, dtype=float)
-        self.bk_buf_original = np.zeros(bk_size, dtype=float)
-
-    def process_line(self, line: str):
+        self.mem_geometry = mem_geometry or DEFAULT_GEOMETRY["MB"]
+        self.bk_geometry = bk_geometry or DEFAULT_GEOMETRY["BK"]
+        # Samples kept per channel for roll mode; default is four channel lengths
+        self.stream_length = stream_length
+        self.mem_snapshot = None
+        self.bk_snapshot = None
+        self._stream_pending = set()
+        self._batching = False
+        self._allocate("MB")
+        self._allocate("BK")
+
+    def _allocate(self, buf_type):
+        """Size the buffers of one type from its geometry; they are reused for every dump."""
+        if buf_type == "MB":
+            size = self.mem_geometry.size
+            # Initialize data buffers similar to Mem_buf and BK_buf in VB code
+            self.mem_buf = np.zeros(size, dtype=float)
+            # Buffers to store original data for gain/offset adjustments
+            self.mem_buf_original = np.zeros(size, dtype=float)
+            # Latest published snapshot; version 0 is the empty buffer
+            version = self.mem_snapshot.version if self.mem_snapshot else 0
+            self.mem_snapshot = WaveformSnapshot("MB", version, self.mem_buf_original.copy(), geometry=self.mem_geometry)
+            # Every sample also goes into a per-channel ring for roll mode
+            self.mem_stream = ChannelRingBuffer(self.mem_geometry.num_channels,
+                                                self.stream_length or 4 * self.mem_geometry.points_per_channel)
+        else:
+            size = self.bk_geometry.size
+            self.bk_buf = np.zeros(size, dtype=float)
+            self.bk_buf_original = np.zeros(size, dtype=float)
+            version = self.bk_snapshot.version if self.bk_snapshot else 0
+            self.bk_snapshot = WaveformSnapshot("BK", version, self.bk_buf_original.copy(), geometry=self.bk_geometry)
+            self.bk_stream = ChannelRingBuffer(self.bk_geometry.num_channels,
+                                               self.stream_length or 4 * self.bk_geometry.points_per_channel)
+
+    def set_geometry(self, geometry):
+        """Switch a buffer to a new layout; the buffers are only reallocated if it changed."""
+        current = self.mem_geometry if geometry.buf_type == "MB" else self.bk_geometry
+        if geometry == current:
+            return
+        if geometry.buf_type == "MB":
+            self.mem_geometry = geometry
+        else:
+            self.bk_geometry = geometry
+        self._allocate(geometry.buf_type)
+        self.geometry_changed.emit(geometry)
+
+    def publish_snapshot(self, buf_type, stamp_ns=None):
+        """Copy the finished buffer once and emit it to every listener."""
+        if buf_type == "MB":
+            self.mem_snapshot = WaveformSnapshot("MB", self.mem_snapshot.version + 1, self.mem_buf_original.copy(),
+                                                 stamp_ns, self.mem_geometry)
+            self.mem_data_updated.emit(self.mem_snapshot)
+        else:
+            self.bk_snapshot = WaveformSnapshot("BK", self.bk_snapshot.version + 1, self.bk_buf_original.copy(),
+                                                stamp_ns, self.bk_geometry)
+            self.bk_data_updated.emit(self.bk_snapshot)
+        # Lines fed one by one through process_line flush the rings once per dump
+        if not self._batching:
+            self.flush_streams()
+
+    def _stream_samples(self, buf_type, addresses, values):
+        """Append dump samples to the channel rings in arrival order."""
+        geometry, stream = (self.mem_geometry, self.mem_stream) if buf_type == "MB" else (self.bk_geometry, self.bk_stream)
+        channels = addresses // geometry.points_per_channel
+        for channel in range(geometry.num_channels):
+            stream.append(channel, values[channels == channel])
+        self._stream_pending.add(buf_type)
+
+    def flush_streams(self):
+        """Tell listeners about streamed samples; called once per batch or frame."""
+        if "MB" in self._stream_pending:
+            self.mem_stream_updated.emit(self.mem_stream)
+        if "BK" in self._stream_pending:
+            self.bk_stream_updated.emit(self.bk_stream)
+        self._stream_pending.clear()
+
+    def process_batch(self, lines, stamps=None):
+        """Process a batch of lines received from the serial port.
+
+        Consecutive MB/BK lines are parsed in bulk; everything else goes
+        through process_line. stamps holds the receive time of each line.
+        """
+        if stamps is None:
+            stamps = [now_ns()] * len(lines)
+        self._batching = True
+        try:
+            self._process_batch(lines, stamps)
+        finally:
+            self._batching = False
+        self.flush_streams()
+
+    def _process_batch(self, lines, stamps):
+        run_start = 0
+        run_header = None
+        for i, line in enumerate(lines):
+            header = line[:3]
+            if header == "MB," or header == "BK,":
+                if header != run_header:
+                    if run_header:
+                        self._process_dump_run(run_header, lines[run_start:i], stamps[run_start:i])
+                    run_header = header
+                    run_start = i
+            else:
+                if run_header:
+                    self._process_dump_run(run_header, lines[run_start:i], stamps[run_start:i])
+                    run_header = None
+                self.process_line(line, stamps[i])
+        if run_header:
+            self._process_dump_run(run_header, lines[run_start:], stamps[run_start:])
+
+    def _process_dump_run(self, header, run, stamps):
+        """Parse a run of "MB,####,FFFF" or "BK,####,FFFF" lines with numpy."""
+        if header == "MB,":
+            buf, buf_original = self.mem_buf, self.mem_buf_original
+        else:
+            buf, buf_original = self.bk_buf, self.bk_buf_original
+
+        # Split the whole run in one call; with exactly three fields per line
+        # the header, address and value columns are plain slices
+        fields = ",".join(run).split(",")
+        line_stamps = stamps
+        if len(fields) == 3 * len(run):
+            address_fields, value_fields = fields[1::3], fields[2::3]
+        else:
+            # Some line has a different field count (e.g. an end marker).
+            # Like process_line, use the first three fields and skip lines
+            # with fewer
+            parts = [line.split(",") for line in run]
+            kept = [i for i, p in enumerate(parts) if len(p) >= 3]
+            address_fields = [parts[i][1] for i in kept]
+            value_fields = [parts[i][2] for i in kept]
+            line_stamps = [stamps[i] for i in kept]
+        try:
+            numbers = np.array(address_fields, dtype=float)
+        except ValueError:
+            self._process_run_per_line(run, stamps)
+            return
+        addresses = numbers.astype(np.int64)
+        is_end = addresses >= buf.size # End of data transmission
+        # The value of an end marker is never used and need not be a number
+        for end in np.flatnonzero(is_end).tolist():
+            value_fields[end] = "0"
+        try:
+            values = np.array(value_fields, dtype=float)
+        except ValueError:
+            self._process_run_per_line(run, stamps)
+            return
+        data_addresses = addresses[~is_end]
+        if (addresses != numbers).any() or (data_addresses.size and
+                (data_addresses.min() < 0 or data_addresses.max() >= buf.size)):
+            self._process_run_per_line(run, stamps)
+            return
+
+        self._stream_samples(header[:2], data_addresses, values[~is_end])
+
+        # Scatter the samples between end markers, emitting at each marker
+        start = 0
+        for end in np.flatnonzero(is_end):
+            buf[addresses[start:end]] = values[start:end]
+            buf_original[addresses[start:end]] = values[start:end]
+            self.publish_snapshot(header[:2], line_stamps[end])
+            start = end + 1
+        buf[addresses[start:]] = values[start:]
+        buf_original[addresses[start:]] = values[start:]
+
+    def _process_run_per_line(self, run, stamps):
+        for line, stamp_ns in zip(run, stamps):
+            self.process_line(line, stamp_ns)
+
+    def process_frame(self, frame, stamp_ns=None):
+        """Process a binary dump frame holding a whole MB or BK buffer."""
+        if stamp_ns is None:
+            stamp_ns = now_ns()
+        try:
+            buf_type, samples = decode_frame(frame)
+        except ValueError as e:
+            self.parsing_error.emit(f"[Frame Error] {e}", stamp_ns)
+            return
+
+        if buf_type == "MB":
+            buf, buf_original = self.mem_buf, self.mem_buf_original
+        else:
+            buf, buf_original = self.bk_buf, self.bk_buf_original
+        if samples.size > buf.size:
+            self.parsing_error.emit(f"[Frame Error] {buf_type} frame has {samples.size} samples, buffer holds {buf.size}", stamp_ns)
+            samples = samples[:buf.size]
+        # samples is a view over the received bytes, converted straight into the buffers
+        buf[:samples.size] = samples
+        buf_original[:samples.size] = samples
+        self._stream_samples(buf_type, np.arange(samples.size), buf_original[:samples.size])
+        self.publish_snapshot(buf_type, stamp_ns)
+
+    def process_line(self, line: str, stamp_ns=None):
         """Process a single line of data received from the serial port."""
+        if stamp_ns is None:
+            stamp_ns = now_ns()
         try:
             line = line.strip()
             if not line:
@@ -30,34 +244,47 @@ class DataProcessor(QObject):
             header = line[:2]
             parts = line.split(',')
 
-            if header == "PI" and len(parts) >= 3:
+            if header == "GE" and parts[0] == "GEO":
+                # Format: "GEO,MB,channels,points_per_channel[,size]"
+                self.set_geometry(BufferGeometry.parse(line))
+
+            elif header == "PI" and len(parts) >= 3:
                 # Format: "PI,##,FFFFFFFFF"
                 index = int(parts[1])
                 value = parts[2]
-                self.pi_data_updated.emit(index, value)
+                self.pi_data_updated.emit(index, value, stamp_ns)
 
             elif header == "MB" and len(parts) >= 3:
                 # Format: "MB,####,FFFF"
                 address = int(parts[1])
-                if address > 4999: # End of data transmission
-                    self.mem_data_updated.emit(self.mem_buf_original)
+                if address >= self.mem_geometry.size: # End of data transmission
+                    self.publish_snapshot("MB", stamp_ns)
                 else:
                     value = float(parts[2])
                     self.mem_buf[address] = value
                     self.mem_buf_original[address] = value
+                    self._stream_value("MB", address, value)
 
             elif header == "BK" and len(parts) >= 3:
                 # Format: "BK,####,FFFF"
                 address = int(parts[1])
-                if address > 4999: # End of data transmission
-                    self.bk_data_updated.emit(self.bk_buf_original)
+                if address >= self.bk_geometry.size: # End of data transmission
+                    self.publish_snapshot("BK", stamp_ns)
                 else:
                     value = float(parts[2])
                     self.bk_buf[address] = value
                     self.bk_buf_original[address] = value
+                    self._stream_value("BK", address, value)
             else:
                 # Not a special command. It's already logged in MainWindow, so we do nothing here.
                 pass
 
         except (ValueError, IndexError) as e:
-            self.parsing_error.emit(f"[Parsing Error] {line} - {e}")
+            self.parsing_error.emit(f"[Parsing Error] {line} - {e}", stamp_ns)
+
+    def _stream_value(self, buf_type, address, value):
+        geometry, stream = (self.mem_geometry, self.mem_stream) if buf_type == "MB" else (self.bk_geometry, self.bk_stream)
+        channel = address // geometry.points_per_channel
+        if 0 <= channel < geometry.num_channels:
+            stream.append_value(channel, value)
+            self._stream_pending.add(buf_type)
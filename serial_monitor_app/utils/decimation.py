@@ -0,0 +1,31 @@
+import numpy as np
+
+def minmax_decimate(data, first, last, buckets):
+    """Reduce data[:, first:last] to a min/max pair per bucket.
+
+    data is a (channels x points) array and buckets is normally the plot
+    width in pixels. Every bucket keeps its smallest and largest sample, so
+    peaks and single-sample glitches stay visible however many points are
+    squeezed into one pixel.
+
+    Returns (x, y): x holds the sample index of each output point, shared by
+    all channels, and y is (channels x len(x)). When the range already fits
+    in 2 * buckets points it is returned unchanged (y is then a view).
+    """
+    first = max(0, int(first))
+    last = min(data.shape[1], int(last))
+    count = last - first
+    if count <= 0:
+        return np.empty(0, dtype=np.int64), data[:, :0]
+    buckets = max(1, int(buckets))
+    if count <= 2 * buckets:
+        return np.arange(first, last), data[:, first:last]
+
+    starts = np.unique(np.linspace(0, count, buckets, endpoint=False).astype(np.int64))
+    visible = data[:, first:last]
+    y = np.empty((data.shape[0], 2 * len(starts)), dtype=data.dtype)
+    np.minimum.reduceat(visible, starts, axis=1, out=y[:, 0::2])
+    np.maximum.reduceat(visible, starts, axis=1, out=y[:, 1::2])
+    # Both points of a bucket sit at its first sample: one vertical stroke per pixel
+    x = np.repeat(starts + first, 2)
+    return x, y
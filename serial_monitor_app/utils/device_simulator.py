@@ -0,0 +1,235 @@
+"""Instrument simulator on a Linux pseudo-terminal.
+
+Run from the serial_monitor_app folder:
+
+    python -m utils.device_simulator --pi-rate 10 --dump-rate 1 --link /tmp/ttySIM0
+
+and connect the app to the printed device path (or the --link path).
+"""
+import argparse
+import errno
+import os
+import select
+import signal
+import threading
+import time
+import tty
+import numpy as np
+from utils.binary_dump import encode_frame
+
+IDN = "SIMULATOR,Serial Monitor Device Simulator,0,1.0"
+NUM_PI_VALUES = 60
+
+class DeviceSimulator:
+    """Answers firmware commands and streams PI/MB/BK traffic on a pty.
+
+    Commands (terminated by CR, as SerialHandler.send_data sends them):
+      *IDN?            identification string
+      :val?            PI,##,value lines for all 60 values (any argument,
+                       as in ":val? 5", is ignored)
+      :mem? addr       "addr=value" from the simulated EEPROM
+      :mem addr=value  EEPROM write, no reply
+      :stmem           one MB dump
+    Everything else is accepted silently.
+
+    pi_rate and dump_rate are in updates per second (0 disables them);
+    periodic dumps alternate between MB and BK. With baud > 0 the output
+    is throttled to about baud / 10 bytes per second like a real UART.
+
+    With geometry=(channels, points_per_channel) the dumps hold exactly
+    channels * points_per_channel samples, and the *IDN? reply is followed
+    by GEO lines announcing that layout for MB and BK.
+    """
+    def __init__(self, pi_rate=0.0, dump_rate=0.0, dump_size=5000, binary=False,
+                 baud=0, seed=0, link=None, geometry=None):
+        self.pi_rate = pi_rate
+        self.dump_rate = dump_rate
+        self.geometry = geometry
+        self.dump_size = geometry[0] * geometry[1] if geometry else dump_size
+        self.points_per_channel = geometry[1] if geometry else 1024
+        self.binary = binary
+        self.bytes_per_second = baud / 10 if baud else 0
+        self.rng = np.random.default_rng(seed)
+        self.eeprom = {}
+        self.dump_count = 0
+        self.pi_count = 0
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        self.link = link
+        if link:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(self.port, link)
+
+        self._out = bytearray()
+        self._in = b''
+        self._running = False
+        self._thread = None
+
+    # --- Traffic generation ---
+    def pi_lines(self):
+        self.pi_count += 1
+        t = self.pi_count / max(self.pi_rate, 1.0)
+        values = 100.0 * np.sin(t + np.arange(NUM_PI_VALUES) * 0.1) + self.rng.normal(0, 0.5, NUM_PI_VALUES)
+        return "".join(f"PI,{i},{v:.3f}\r\n" for i, v in enumerate(values))
+
+    def dump_bytes(self, header):
+        self.dump_count += 1
+        n = np.arange(self.dump_size)
+        phase = self.dump_count * 0.2
+        # Channels with different frequencies, like the MB layout
+        points = self.points_per_channel
+        samples = 2000 + 1500 * np.sin(2 * np.pi * (n % points) / points * (1 + n // points) + phase)
+        samples = np.round(samples + self.rng.normal(0, 20, self.dump_size)).astype(np.int16)
+        if self.binary:
+            return encode_frame(header, samples)
+        # Without an announced geometry the app expects the end marker above 4999
+        end_address = self.dump_size if self.geometry else max(self.dump_size, 5000)
+        text = "".join(f"{header},{a},{v}\r\n" for a, v in enumerate(samples.tolist()))
+        return (text + f"{header},{end_address},0\r\n").encode('ascii')
+
+    def handle_command(self, command):
+        command = command.strip()
+        lower = command.lower()
+        if lower == "*idn?":
+            reply = IDN + "\r\n"
+            if self.geometry:
+                channels, points = self.geometry
+                reply += "".join(f"GEO,{h},{channels},{points},{self.dump_size}\r\n" for h in ("MB", "BK"))
+            return reply
+        if lower.startswith(":val?"):
+            return self.pi_lines()
+        if lower.startswith(":mem?"):
+            try:
+                address = int(command.split()[1])
+            except (IndexError, ValueError):
+                return ""
+            return f"{address}={self.eeprom.get(address, 0)}\r\n"
+        if lower.startswith(":mem ") and "=" in command:
+            address, value = command[5:].split("=", 1)
+            try:
+                self.eeprom[int(address)] = value.strip()
+            except ValueError:
+                pass
+            return ""
+        if lower == ":stmem":
+            return self.dump_bytes("MB")
+        return ""
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode('ascii')
+        # Drop streamed output if nobody reads the port for a long time
+        if len(self._out) < (8 << 20):
+            self._out += data
+
+    # --- Event loop ---
+    def run(self):
+        self._running = True
+        now = time.monotonic()
+        next_pi = now if self.pi_rate > 0 else None
+        next_dump = now if self.dump_rate > 0 else None
+        dump_headers = ("MB", "BK")
+        last_write = now
+        while self._running:
+            now = time.monotonic()
+            if next_pi is not None and now >= next_pi:
+                self.send(self.pi_lines())
+                next_pi += 1.0 / self.pi_rate
+            if next_dump is not None and now >= next_dump:
+                self.send(self.dump_bytes(dump_headers[self.dump_count % 2]))
+                next_dump += 1.0 / self.dump_rate
+
+            deadlines = [t for t in (next_pi, next_dump) if t is not None]
+            timeout = max(0.0, min(deadlines) - now) if deadlines else 0.1
+            timeout = min(timeout, 0.1)
+            writers = [self.master] if self._out else []
+            readable, writable, _ = select.select([self.master], writers, [], timeout)
+
+            if readable:
+                self._read_commands()
+            if writable and self._out:
+                budget = len(self._out)
+                if self.bytes_per_second:
+                    now = time.monotonic()
+                    budget = max(1, int((now - last_write) * self.bytes_per_second))
+                    last_write = now
+                self._write(budget)
+            elif not self._out:
+                last_write = time.monotonic()
+
+    def _read_commands(self):
+        try:
+            data = os.read(self.master, 4096)
+        except OSError as e:
+            # EIO until a client opens the slave side
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                time.sleep(0.01)
+                return
+            raise
+        self._in += data.replace(b'\n', b'\r')
+        *commands, self._in = self._in.split(b'\r')
+        for command in commands:
+            if command.strip():
+                reply = self.handle_command(command.decode('ascii', errors='replace'))
+                if reply:
+                    self.send(reply)
+
+    def _write(self, budget):
+        try:
+            written = os.write(self.master, self._out[:min(budget, 65536)])
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EIO):
+                time.sleep(0.01)
+                return
+            raise
+        del self._out[:written]
+
+    def start(self):
+        """Run the simulator on a background thread."""
+        self._thread = threading.Thread(target=self.run, name="DeviceSimulator", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+        os.close(self.master)
+        os.close(self.slave)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial device simulator on a pseudo-terminal")
+    parser.add_argument("--pi-rate", type=float, default=0.0, help="PI updates per second (all 60 values)")
+    parser.add_argument("--dump-rate", type=float, default=0.0, help="MB/BK dumps per second, alternating")
+    parser.add_argument("--dump-size", type=int, default=5000, help="samples per dump")
+    parser.add_argument("--binary", action="store_true", help="send dumps as binary frames")
+    parser.add_argument("--baud", type=int, default=0, help="throttle output like a UART at this baud rate")
+    parser.add_argument("--geometry", help="announce and use this layout, e.g. 8x4096 (channels x points)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the generated noise")
+    parser.add_argument("--link", help="create a symlink to the pty at this path")
+    args = parser.parse_args()
+    geometry = tuple(int(v) for v in args.geometry.lower().split("x")) if args.geometry else None
+
+    simulator = DeviceSimulator(args.pi_rate, args.dump_rate, args.dump_size, args.binary,
+                                args.baud, args.seed, args.link, geometry)
+    print(f"Simulator listening on {simulator.port}" + (f" ({args.link})" if args.link else ""), flush=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: simulator.stop())
+    try:
+        simulator.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+
+if __name__ == "__main__":
+    main()
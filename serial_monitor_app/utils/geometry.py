@@ -0,0 +1,70 @@
+import json
+
+# Largest layout a device may announce; a corrupted GEO line must not make
+# the app allocate gigabytes (the same sample limit as binary dump frames)
+MAX_CHANNELS = 64
+MAX_SIZE = 1 << 22
+
+class BufferGeometry:
+    """Layout of an MB or BK dump buffer.
+
+    size is the number of samples in the buffer; addresses at or above it
+    mark the end of a dump. The first num_channels * points_per_channel
+    samples are split into channels for plotting.
+
+    A device can announce its geometry with a line
+        GEO,<MB|BK>,<channels>,<points per channel>[,<size>]
+    and a profile can set it in config/geometry.json.
+    """
+    __slots__ = ('buf_type', 'num_channels', 'points_per_channel', 'size')
+
+    def __init__(self, buf_type, num_channels, points_per_channel, size=None):
+        if num_channels < 1 or points_per_channel < 1:
+            raise ValueError(f"invalid {buf_type} geometry {num_channels} x {points_per_channel}")
+        self.buf_type = buf_type
+        self.num_channels = int(num_channels)
+        self.points_per_channel = int(points_per_channel)
+        self.size = int(size) if size is not None else self.num_channels * self.points_per_channel
+        if self.size < self.plotted_size:
+            raise ValueError(f"{buf_type} buffer of {self.size} samples is smaller than {num_channels} x {points_per_channel}")
+
+    @property
+    def plotted_size(self):
+        return self.num_channels * self.points_per_channel
+
+    @classmethod
+    def parse(cls, line):
+        """Build a geometry from a device "GEO,MB,4,1024,5000" line."""
+        parts = line.strip().split(',')
+        if len(parts) not in (4, 5) or parts[0] != "GEO" or parts[1] not in ("MB", "BK"):
+            raise ValueError(f"not a geometry line: {line.strip()}")
+        geometry = cls(parts[1], *(int(p) for p in parts[2:]))
+        if geometry.num_channels > MAX_CHANNELS or geometry.size > MAX_SIZE:
+            raise ValueError(f"{geometry.buf_type} geometry {geometry.num_channels} x {geometry.points_per_channel} "
+                             f"({geometry.size} samples) exceeds {MAX_CHANNELS} channels or {MAX_SIZE} samples")
+        return geometry
+
+    def __eq__(self, other):
+        return (isinstance(other, BufferGeometry) and self.buf_type == other.buf_type and
+                self.num_channels == other.num_channels and
+                self.points_per_channel == other.points_per_channel and self.size == other.size)
+
+    def __repr__(self):
+        return f"BufferGeometry({self.buf_type!r}, {self.num_channels}, {self.points_per_channel}, {self.size})"
+
+# The layout of the current firmware
+DEFAULT_GEOMETRY = {
+    "MB": BufferGeometry("MB", 4, 1024, 5000),
+    "BK": BufferGeometry("BK", 8, 512, 5000),
+}
+
+def load_geometry_profile(path):
+    """Read {"MB": {"num_channels": .., "points_per_channel": .., "size": ..}, "BK": {..}}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+    geometries = {}
+    for buf_type, layout in profile.items():
+        if buf_type in ("MB", "BK"):
+            geometries[buf_type] = BufferGeometry(buf_type, layout["num_channels"],
+                                                  layout["points_per_channel"], layout.get("size"))
+    return geometries
@@ -0,0 +1,235 @@
+import csv
+import gzip
+import io
+import lzma
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+
+# Suffix and opener of each supported segment compression
+COMPRESSIONS = {
+    "gzip": (".gz", lambda path: gzip.open(path, 'wb', compresslevel=6)),
+    "lzma": (".xz", lambda path: lzma.open(path, 'wb')),
+}
+
+# Shortest flush interval; it is also the queue timeout of the writer thread,
+# so 0 would make it spin and a negative value would stop it
+MIN_FLUSH_INTERVAL = 0.01
+
+def segment_path(path, number):
+    """log.csv -> log_0001.csv"""
+    base, ext = os.path.splitext(path)
+    return f"{base}_{number:04d}{ext}"
+
+def compress_file(path, compression):
+    """Compress path next to itself, remove the original and return the new path."""
+    suffix, opener = COMPRESSIONS[compression]
+    target = path + suffix
+    # Written under a temporary name so an interrupted run never leaves a
+    # truncated archive next to a deleted original
+    partial = target + '.part'
+    with open(path, 'rb') as src, opener(partial) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    os.replace(partial, target)
+    os.remove(path)
+    return target
+
+class SegmentCompressor:
+    """Compresses finished log segments and prunes old ones in a background thread.
+
+    add() only queues the path, so rotating never waits for compression.
+    With keep_segments set, only that many finished segments are kept and
+    older ones are deleted.
+    """
+    _STOP = object()
+
+    def __init__(self, compression=None, keep_segments=0):
+        self.compression = compression
+        self.keep_segments = keep_segments
+        self.files = deque() # finished segments, oldest first
+        self.compressed = 0
+        self.error = None
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="SegmentCompressor", daemon=True)
+        self._thread.start()
+
+    def add(self, path):
+        self._queue.put(path)
+
+    def finish(self, wait=False):
+        """Stop after the queued segments are done, optionally waiting for it."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            if wait:
+                self._thread.join()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is self._STOP:
+                break
+            try:
+                if self.compression:
+                    path = compress_file(path, self.compression)
+                    self.compressed += 1
+                self.files.append(path)
+                while self.keep_segments and len(self.files) > self.keep_segments:
+                    os.remove(self.files.popleft())
+            except Exception as e:
+                # Recorded and skipped; the following segments are still handled
+                self.error = e
+
+class LogWriter:
+    """Writes CSV log rows from a background thread into a file kept open.
+
+    write() only puts the row on a queue, so logging costs the GUI thread
+    next to nothing. The writer thread formats the rows with format_row,
+    writes whatever has queued up in one go, flushes every flush_interval
+    seconds and fsyncs every fsync_interval seconds (0 disables fsync until
+    close). queue_depth, last_latency and max_latency (seconds from write()
+    to the row reaching the file) show whether the disk keeps up.
+
+    With max_bytes or max_seconds set, the log is split into segments named
+    <name>_0001.csv, <name>_0002.csv, ... Each segment starts with the
+    header; finished ones are handed to a SegmentCompressor, which
+    compresses them (compression "gzip" or "lzma") and keeps only the last
+    keep_segments of them if that is set. path is the current segment.
+
+    Subclasses can store another format by overriding _open, _write_batch
+    and _flush.
+    """
+    _STOP = object()
+
+    def __init__(self, path, header=None, format_row=None, flush_interval=1.0, fsync_interval=10.0,
+                 max_bytes=0, max_seconds=0, compression=None, keep_segments=0):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"unknown compression {compression!r}")
+        self.base_path = path
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.rotating = bool(max_bytes or max_seconds)
+        self.segment = 1
+        self.path = segment_path(path, 1) if self.rotating else path
+        self.compressor = None
+        self._header = header
+        self._segment_start = time.monotonic()
+        # Bytes written to the current segment, counted instead of asking
+        # the file for its position, which would flush its buffer
+        self.segment_bytes = 0
+        self.format_row = format_row or list
+        self.flush_interval = max(flush_interval, MIN_FLUSH_INTERVAL)
+        self.fsync_interval = max(fsync_interval, 0)
+        self.rows_written = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        # Set if the writer thread failed; later rows are dropped
+        self.error = None
+        self._queue = queue.SimpleQueue()
+        # Opened here so that a bad path is reported to the caller at once
+        self._open(header)
+        if self.rotating:
+            self.compressor = SegmentCompressor(compression, keep_segments)
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def write(self, row):
+        # Nothing would ever take the row off the queue once the thread is gone
+        if self.error is None and self._thread.is_alive():
+            self._queue.put((time.monotonic(), row))
+
+    def close(self):
+        """Write everything still queued, sync and close the file."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        if self.compressor is not None:
+            # Segments still being compressed are finished in the background
+            self.compressor.finish()
+
+    def _run(self):
+        last_flush = last_sync = time.monotonic()
+        try:
+            while True:
+                try:
+                    items = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    items = []
+                # Drain whatever else is waiting and write it in one go
+                while True:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = bool(items) and items[-1] is self._STOP
+                if stop:
+                    items.pop()
+                self._write_rows(items)
+                if stop:
+                    break
+                now = time.monotonic()
+                if self.rotating and self._segment_full(now):
+                    self._rotate()
+                    last_flush = last_sync = self._segment_start
+                    continue
+                if now - last_flush >= self.flush_interval:
+                    self._flush()
+                    last_flush = now
+                    if self.fsync_interval and now - last_sync >= self.fsync_interval:
+                        os.fsync(self._file.fileno())
+                        last_sync = now
+            self._flush(final=True)
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            # A row format_row cannot handle stops the writer like a disk error
+            self.error = e
+        finally:
+            self._file.close()
+
+    def _segment_full(self, now):
+        if self.max_seconds and now - self._segment_start >= self.max_seconds:
+            return True
+        return bool(self.max_bytes) and self.segment_bytes >= self.max_bytes
+
+    def _rotate(self):
+        """Close the current segment, hand it to the compressor and start the next."""
+        self._flush(final=True)
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self.compressor.add(self.path)
+        self.segment += 1
+        self.path = segment_path(self.base_path, self.segment)
+        self.segment_bytes = 0
+        self._open(self._header)
+        self._segment_start = time.monotonic()
+
+    def _open(self, header):
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        if header is not None:
+            self._write_batch([header])
+
+    def _write_batch(self, rows):
+        # Formatted into a string first so the bytes of the segment can be counted
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        data = text.getvalue()
+        self._file.write(data)
+        self.segment_bytes += len(data.encode('utf-8'))
+
+    def _flush(self, final=False):
+        self._file.flush()
+
+    def _write_rows(self, items):
+        if not items:
+            return
+        self._write_batch([self.format_row(row) for _, row in items])
+        self.rows_written += len(items)
+        # The oldest row of the batch waited longest
+        self.last_latency = time.monotonic() - items[0][0]
+        self.max_latency = max(self.max_latency, self.last_latency)
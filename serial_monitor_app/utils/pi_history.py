@@ -0,0 +1,54 @@
+import numpy as np
+from utils.ring_buffer import ChannelRingBuffer
+
+class PIHistory:
+    """Bounded time series of every PI value.
+
+    Values and their receive stamps are kept in two (channels x capacity)
+    ring buffers, so recording a sample is O(1) and memory stays fixed
+    however long auto-run polls the device. Older samples are overwritten.
+    """
+
+    def __init__(self, num_channels=60, capacity=10000):
+        self.values = ChannelRingBuffer(num_channels, capacity, fill=np.nan)
+        self.stamps = ChannelRingBuffer(num_channels, capacity, dtype=np.int64)
+        # Scratch arrays reused by series()
+        self._value_scratch = np.empty(capacity)
+        self._stamp_scratch = np.empty(capacity, dtype=np.int64)
+
+    @property
+    def num_channels(self):
+        return self.values.num_channels
+
+    @property
+    def capacity(self):
+        return self.values.capacity
+
+    def record(self, index, value, stamp_ns):
+        """Slot for pi_data_updated(index, value, stamp_ns)."""
+        if not 0 <= index < self.values.num_channels:
+            return
+        try:
+            number = float(value)
+        except ValueError:
+            number = np.nan
+        self.values.append_value(index, number)
+        self.stamps.append_value(index, stamp_ns)
+
+    def series(self, channel, since_ns=None):
+        """Return (stamps, values) of one channel, oldest first, from since_ns on.
+
+        The arrays are views into scratch buffers and are only valid until
+        the next call.
+        """
+        count = self.values.counts[channel]
+        stamps = self.stamps.ordered(channel, self._stamp_scratch)[self.capacity - count:]
+        values = self.values.ordered(channel, self._value_scratch)[self.capacity - count:]
+        if since_ns is not None:
+            first = np.searchsorted(stamps, since_ns, side='left')
+            stamps, values = stamps[first:], values[first:]
+        return stamps, values
+
+    def clear(self):
+        self.values.clear(np.nan)
+        self.stamps.clear()
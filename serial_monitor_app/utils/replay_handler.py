@@ -0,0 +1,152 @@
+import os
+import time
+from PySide6.QtCore import QObject, Signal, QTimer
+from utils.binary_dump import StreamSplitter
+from utils.capture import CaptureReader
+
+class ReplayHandler(QObject):
+    """Feeds a recorded capture file into the app in place of SerialHandler.
+
+    Emits the same lines_received/frame_received signals as SerialHandler.
+    speed is a time scale: 1.0 replays in real time, 10.0 ten times faster
+    and 0 as fast as the receiving slots can keep up.
+
+    Batch boundaries depend only on the recorded stamps (batch_size lines,
+    or max_latency_ms of recorded time, or a binary frame), so the same
+    capture always produces the same sequence of batches at any speed.
+    Emitted stamps are on this session's monotonic clock: the recorded
+    offset from the first record divided by speed, or the emit time at
+    maximum speed, so they never run ahead of the clock and stay sorted.
+    """
+    replay_started = Signal()
+    # Signal(dict) with lines, frames, bytes and seconds of the finished replay
+    replay_finished = Signal(dict)
+    port_error = Signal(str)
+    lines_received = Signal(list, list)
+    frame_received = Signal(object, object)
+
+    def __init__(self, batch_size=256, max_latency_ms=50):
+        super().__init__()
+        self.batch_size = batch_size
+        self.max_latency_ns = int(max_latency_ms * 1_000_000)
+        self.reader = None
+        self.speed = 1.0
+        self.frame_limits = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._pump)
+
+    def set_frame_limit(self, geometry):
+        """Reject binary frames with more samples than the geometry's buffer holds."""
+        self.frame_limits[geometry.buf_type] = geometry.size
+
+    def is_running(self):
+        return self.reader is not None
+
+    def port_name(self):
+        return os.path.basename(self.reader.path) if self.reader else ""
+
+    def start(self, path, speed=1.0):
+        if self.reader:
+            self.port_error.emit("A replay is already running.")
+            return
+        try:
+            self.reader = CaptureReader(path)
+        except (OSError, ValueError) as e:
+            self.port_error.emit(f"Error opening capture file: {e}")
+            return
+        self.speed = speed
+        self.splitter = StreamSplitter(self.frame_limits)
+        self.next_record = 0
+        self.batch = []
+        self.stamps = []
+        self.batch_first_stamp = 0
+        self.stats = {'lines': 0, 'frames': 0, 'bytes': 0, 'seconds': 0.0}
+        time_range = self.reader.time_range()
+        self.first_stamp = time_range[0] if time_range else 0
+        self.start_ns = time.monotonic_ns()
+        self.replay_started.emit()
+        self.timer.start(0)
+
+    def stop(self):
+        """Stop the replay early; replay_finished is still emitted."""
+        if self.reader:
+            self._finish()
+
+    def _pump(self):
+        reader = self.reader
+        count = len(reader)
+        if self.speed > 0:
+            elapsed_ns = (time.monotonic_ns() - self.start_ns) * self.speed
+            due = reader.find(self.first_stamp + elapsed_ns + 1)
+        else:
+            due = count
+        emitted = False
+        while self.next_record < due and self.reader:
+            emitted |= self._replay_record(self.next_record)
+            self.next_record += 1
+            # Hand control back to the event loop after each batch in max-speed mode
+            if self.speed <= 0 and emitted:
+                break
+
+        if not self.reader:
+            return
+        if self.next_record >= count:
+            self._finish()
+        elif self.speed > 0:
+            next_stamp = int(reader.index['stamp_ns'][self.next_record])
+            wait_ns = (next_stamp - self.first_stamp) / self.speed - (time.monotonic_ns() - self.start_ns)
+            self.timer.start(max(0, int(wait_ns / 1_000_000)))
+        else:
+            self.timer.start(0)
+
+    def _replay_record(self, i):
+        """Split one recorded chunk; returns True if anything was emitted."""
+        stamp, data = self.reader.record(i)
+        # Batching works on the recorded stamps, the signals carry session stamps
+        if self.speed > 0:
+            session_stamp = self.start_ns + int((stamp - self.first_stamp) / self.speed)
+        else:
+            session_stamp = time.monotonic_ns()
+        self.stats['bytes'] += len(data)
+        emitted = False
+        for item in self.splitter.feed(data, stamp):
+            if isinstance(item, bytes):
+                emitted |= self._emit_batch()
+                self.stats['frames'] += 1
+                self.frame_received.emit(item, session_stamp)
+                emitted = True
+            else:
+                if not self.batch:
+                    self.batch_first_stamp = stamp
+                self.batch.append(item)
+                self.stamps.append(session_stamp)
+                if len(self.batch) >= self.batch_size:
+                    emitted |= self._emit_batch()
+
+        # Close the batch once the next record would make it too old
+        if self.batch and self.reader:
+            if i + 1 >= len(self.reader):
+                emitted |= self._emit_batch()
+            else:
+                next_stamp = int(self.reader.index['stamp_ns'][i + 1])
+                if next_stamp - self.batch_first_stamp >= self.max_latency_ns:
+                    emitted |= self._emit_batch()
+        return emitted
+
+    def _emit_batch(self):
+        if not self.batch:
+            return False
+        batch, stamps = self.batch, self.stamps
+        self.batch, self.stamps = [], []
+        self.stats['lines'] += len(batch)
+        self.lines_received.emit(batch, stamps)
+        return True
+
+    def _finish(self):
+        self.timer.stop()
+        self._emit_batch()
+        self.stats['seconds'] = (time.monotonic_ns() - self.start_ns) / 1e9
+        self.reader.close()
+        self.reader = None
+        self.replay_finished.emit(self.stats)
@@ -0,0 +1,74 @@
+import numpy as np
+
+class ChannelRingBuffer:
+    """A fixed-size circular buffer per channel, preallocated as one array.
+
+    data is (num_channels x capacity). Each channel has its own write
+    position, so channels can be filled independently. Appending n samples
+    costs O(n) with at most two slice copies, and nothing is reallocated
+    after construction. total counts every sample appended since
+    construction or the last clear() and can be used to tell whether
+    anything changed.
+    """
+
+    def __init__(self, num_channels, capacity, dtype=float, fill=0):
+        self.capacity = int(capacity)
+        self.data = np.full((num_channels, self.capacity), fill, dtype=dtype)
+        # Plain lists: indexing them is much cheaper than numpy scalars per value
+        self.heads = [0] * num_channels # next write position
+        self.counts = [0] * num_channels
+        self.total = 0
+
+    @property
+    def num_channels(self):
+        return self.data.shape[0]
+
+    def append_value(self, channel, value):
+        head = self.heads[channel]
+        self.data[channel, head] = value
+        self.heads[channel] = head + 1 if head + 1 < self.capacity else 0
+        if self.counts[channel] < self.capacity:
+            self.counts[channel] += 1
+        self.total += 1
+
+    def append(self, channel, values):
+        """Append a 1-D block of samples to one channel."""
+        n = len(values)
+        if n == 0:
+            return
+        capacity = self.capacity
+        row = self.data[channel]
+        if n >= capacity:
+            row[:] = values[n - capacity:]
+            self.heads[channel] = 0
+        else:
+            head = self.heads[channel]
+            first = min(n, capacity - head)
+            row[head:head + first] = values[:first]
+            row[:n - first] = values[first:]
+            self.heads[channel] = (head + n) % capacity
+        self.counts[channel] = min(capacity, self.counts[channel] + n)
+        self.total += n
+
+    def ordered(self, channel, out=None):
+        """Return one channel oldest to newest, written into out if given."""
+        head = self.heads[channel]
+        row = self.data[channel]
+        if out is None:
+            out = np.empty(self.capacity, dtype=self.data.dtype)
+        tail = self.capacity - head
+        out[:tail] = row[head:]
+        out[tail:] = row[:head]
+        return out
+
+    def copy_ordered(self, out):
+        """Write every channel oldest to newest into a (num_channels x capacity) array."""
+        for channel in range(self.num_channels):
+            self.ordered(channel, out[channel])
+        return out
+
+    def clear(self, fill=0):
+        self.data.fill(fill)
+        self.heads = [0] * self.num_channels
+        self.counts = [0] * self.num_channels
+        self.total = 0
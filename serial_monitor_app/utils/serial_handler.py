@@ -1,26 +1,103 @@
+import time
 import serial
 import serial.tools.list_ports
 from PySide6.QtCore import QObject, Signal, QThread
+from utils.binary_dump import StreamSplitter
+from utils.capture import CaptureWriter
 
 class SerialWorker(QObject):
     """Worker object that runs in a separate thread to read from serial port."""
-    data_received = Signal(str)
+    # Signal(lines, stamps): complete lines and their monotonic receive times in ns
+    lines_received = Signal(list, list)
+    # Signal(frame, stamp): one complete binary dump frame and its receive time
+    frame_received = Signal(object, object)
     finished = Signal()
 
-    def __init__(self, serial_instance):
+    def __init__(self, serial_instance, read_mode="chunk", batch_size=256, max_latency_ms=50, frame_limits=None):
         super().__init__()
         self.serial = serial_instance
+        self.read_mode = read_mode
+        self.batch_size = max(1, int(batch_size))
+        self.max_latency = max_latency_ms / 1000.0
+        # Largest sample count accepted per buffer type, shared with the handler
+        self.frame_limits = frame_limits
+        # Optional CaptureWriter that receives every raw chunk with its stamp
+        self.capture = None
         self._is_running = True
 
     def run(self):
+        if self.read_mode == "chunk":
+            self.run_chunked()
+        else:
+            self.run_lines()
+        self.finished.emit()
+
+    def run_lines(self):
+        """Legacy mode: one readline() and one signal per line."""
         while self._is_running and self.serial and self.serial.is_open:
             try:
-                line = self.serial.readline().decode('utf-8').strip()
+                raw = self.serial.readline()
+                stamp = time.monotonic_ns()
+                capture = self.capture
+                if raw and capture:
+                    capture.write(stamp, raw)
+                line = raw.decode('utf-8').strip()
                 if line:
-                    self.data_received.emit(line)
+                    self.lines_received.emit([line], [stamp])
             except serial.SerialException:
                 self._is_running = False
-        self.finished.emit()
+
+    def run_chunked(self):
+        """Drain in_waiting in large chunks and deliver complete lines in batches.
+
+        A batch is emitted once it holds batch_size lines or its oldest line
+        has waited max_latency seconds, whichever comes first. Binary dump
+        frames are detected in the same stream and emitted as soon as they
+        are complete. Every line is stamped with the time its chunk was read.
+        """
+        splitter = StreamSplitter(self.frame_limits)
+        batch = []
+        stamps = []
+        batch_started = 0.0
+        while self._is_running and self.serial and self.serial.is_open:
+            try:
+                # Blocks for at most the port timeout when nothing is waiting
+                chunk = self.serial.read(self.serial.in_waiting or 1)
+            except serial.SerialException:
+                self._is_running = False
+                break
+
+            if chunk:
+                stamp = time.monotonic_ns()
+                capture = self.capture
+                if capture:
+                    capture.write(stamp, chunk)
+                for item in splitter.feed(chunk, stamp):
+                    if isinstance(item, bytes):
+                        # Deliver text that preceded the frame first to keep ordering
+                        if batch:
+                            self.lines_received.emit(batch, stamps)
+                            batch = []
+                            stamps = []
+                        self.frame_received.emit(item, stamp)
+                    else:
+                        if not batch:
+                            batch_started = time.monotonic()
+                        batch.append(item)
+                        stamps.append(stamp)
+
+            while len(batch) >= self.batch_size:
+                self.lines_received.emit(batch[:self.batch_size], stamps[:self.batch_size])
+                batch = batch[self.batch_size:]
+                stamps = stamps[self.batch_size:]
+                batch_started = time.monotonic()
+            if batch and time.monotonic() - batch_started >= self.max_latency:
+                self.lines_received.emit(batch, stamps)
+                batch = []
+                stamps = []
+
+        if batch:
+            self.lines_received.emit(batch, stamps)
 
     def stop(self):
         self._is_running = False
@@ -30,13 +107,26 @@ class SerialHandler(QObject):
     port_opened = Signal()
     port_closed = Signal()
     port_error = Signal(str)
-    data_received = Signal(str)
+    # Signal(lines, stamps) with a batch of received lines and their receive times
+    lines_received = Signal(list, list)
+    # Signal(frame, stamp) with a binary dump frame (chunk mode only)
+    frame_received = Signal(object, object)
 
-    def __init__(self):
+    def __init__(self, read_mode="chunk", batch_size=256, max_latency_ms=50):
         super().__init__()
         self.serial = None
         self.thread = None
         self.worker = None
+        # "chunk" drains the port in bulk and batches lines, "line" is the legacy readline() loop
+        self.read_mode = read_mode
+        self.batch_size = batch_size
+        self.max_latency_ms = max_latency_ms
+        self.capture = None
+        self.frame_limits = {}
+
+    def set_frame_limit(self, geometry):
+        """Reject binary frames with more samples than the geometry's buffer holds."""
+        self.frame_limits[geometry.buf_type] = geometry.size
 
     @staticmethod
     def get_available_ports():
@@ -51,15 +141,19 @@ class SerialHandler(QObject):
 
         try:
             parity_map = {"None": serial.PARITY_NONE, "Odd": serial.PARITY_ODD, "Even": serial.PARITY_EVEN}
+            # In chunk mode the read timeout bounds how long a partial batch can wait
+            timeout = self.max_latency_ms / 1000.0 if self.read_mode == "chunk" else 1
             self.serial = serial.Serial(
                 port=port,
                 baudrate=int(baudrate),
                 parity=parity_map.get(parity_str, serial.PARITY_NONE),
-                timeout=1
+                timeout=timeout
             )
 
             self.thread = QThread()
-            self.worker = SerialWorker(self.serial)
+            self.worker = SerialWorker(self.serial, self.read_mode, self.batch_size, self.max_latency_ms,
+                                       self.frame_limits)
+            self.worker.capture = self.capture
             self.worker.moveToThread(self.thread)
 
             # Connect signals
@@ -67,7 +161,8 @@ class SerialHandler(QObject):
             self.worker.finished.connect(self.thread.quit)
             self.worker.finished.connect(self.worker.deleteLater)
             self.thread.finished.connect(self.thread.deleteLater)
-            self.worker.data_received.connect(self.data_received)
+            self.worker.lines_received.connect(self.lines_received)
+            self.worker.frame_received.connect(self.frame_received)
 
             self.thread.start()
             self.port_opened.emit()
@@ -89,6 +184,29 @@ class SerialHandler(QObject):
         self.worker = None
         self.port_closed.emit()
 
+    def start_capture(self, path):
+        """Record every received byte to a capture file until stop_capture()."""
+        self.stop_capture()
+        try:
+            self.capture = CaptureWriter(path)
+        except OSError as e:
+            self.port_error.emit(f"Error opening capture file: {e}")
+            return False
+        if self.worker:
+            self.worker.capture = self.capture
+        return True
+
+    def stop_capture(self):
+        """Stop recording; returns the finished CaptureWriter or None."""
+        capture = self.capture
+        if capture is None:
+            return None
+        self.capture = None
+        if self.worker:
+            self.worker.capture = None
+        capture.close()
+        return capture
+
     def send_data(self, data):
         if self.serial and self.serial.is_open:
             try:
@@ -0,0 +1,23 @@
+import time
+
+# Receive stamps are time.monotonic_ns() values taken in the reader thread.
+# They are only turned into wall-clock text when something is displayed.
+_WALL_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+def now_ns():
+    return time.monotonic_ns()
+
+def to_wall_ns(stamp_ns):
+    """Convert a monotonic receive stamp to nanoseconds since the epoch."""
+    return stamp_ns + _WALL_OFFSET_NS
+
+def format_stamp(stamp_ns):
+    """Format a receive stamp as "[HH:MM:SS.mmm]" in local time."""
+    seconds, rem = divmod(to_wall_ns(stamp_ns), 1_000_000_000)
+    return f"[{time.strftime('%H:%M:%S', time.localtime(seconds))}.{rem // 1_000_000:03d}]"
+
+def format_datetime(stamp_ns, fraction=False):
+    """Format a receive stamp as "YYYY-MM-DD HH:MM:SS[.ffffff]" in local time."""
+    seconds, rem = divmod(to_wall_ns(stamp_ns), 1_000_000_000)
+    text = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(seconds))
+    return f"{text}.{rem // 1000:06d}" if fraction else text
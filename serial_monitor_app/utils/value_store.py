@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+
+class ValueStore:
+    """The latest value of every PI channel, independent of any widget.
+
+    Fed by DataProcessor.pi_data_updated. For each channel it keeps the
+    parsed number (NaN if the text is not a number), the raw text, the
+    receive stamp and the sequence number of its last update; seq counts
+    every update, so a reader can tell whether anything changed. A lock
+    makes it safe to read from threads other than the GUI thread.
+    """
+
+    def __init__(self, num_values=60):
+        self.num_values = num_values
+        self.numbers = np.full(num_values, np.nan)
+        self.raw = [""] * num_values
+        self.stamps = np.zeros(num_values, dtype=np.int64)
+        self.seqs = np.zeros(num_values, dtype=np.int64)
+        self.seq = 0
+        self.labels = [f"Value {i + 1}:" for i in range(num_values)]
+        self._lock = threading.Lock()
+
+    def update(self, index, value, stamp_ns):
+        """Slot for pi_data_updated(index, value, stamp_ns)."""
+        if not 0 <= index < self.num_values:
+            return
+        text = str(value)
+        try:
+            number = float(text)
+        except ValueError:
+            number = np.nan
+        with self._lock:
+            self.seq += 1
+            self.numbers[index] = number
+            self.raw[index] = text
+            self.stamps[index] = stamp_ns
+            self.seqs[index] = self.seq
+
+    def set_label(self, index, text):
+        if 0 <= index < self.num_values:
+            self.labels[index] = text
+
+    def get_labels(self, indices=None):
+        if indices is None:
+            return list(self.labels)
+        return [self.labels[i] for i in indices]
+
+    def raw_values(self, indices=None):
+        """Return the latest texts, all of them or those at indices."""
+        with self._lock:
+            if indices is None:
+                return list(self.raw)
+            return [self.raw[i] for i in indices]
+
+    def snapshot(self, indices=None):
+        """Return (seq, numbers, stamps, seqs) copies taken under the lock."""
+        selection = slice(None) if indices is None else np.asarray(indices)
+        with self._lock:
+            return (self.seq, self.numbers[selection].copy(),
+                    self.stamps[selection].copy(), self.seqs[selection].copy())
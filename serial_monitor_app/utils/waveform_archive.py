@@ -0,0 +1,122 @@
+import os
+import queue
+import threading
+import numpy as np
+from utils.timestamps import now_ns, to_wall_ns
+
+# Archive folder:
+#   <buf type>_<number>.npz  one np.savez_compressed file per dump with the
+#                            arrays data, gains, offsets and the scalars
+#                            buf_type, version, stamp_ns, wall_ns,
+#                            num_channels, points_per_channel, size
+#   index.bin                one INDEX_DTYPE entry per file, in archive order,
+#                            so dumps can be looked up by time with
+#                            np.searchsorted on a memory-mapped array
+# gains and offsets are (windows x channels): the settings of every open
+# graph window of that buffer type when the dump arrived.
+INDEX_NAME = 'index.bin'
+INDEX_DTYPE = np.dtype([('wall_ns', '<i8'), ('stamp_ns', '<i8'), ('version', '<i8'),
+                        ('number', '<u4'), ('buf_type', 'S2')])
+
+def archive_file_name(buf_type, number):
+    return f"{buf_type}_{number:06d}.npz"
+
+class WaveformArchiver:
+    """Saves every finished MB/BK dump to a compressed .npz from a background thread.
+
+    archive() only queues the snapshot; snapshots are immutable, so no copy
+    is needed. Numbering continues after the files already in the folder.
+    """
+    _STOP = object()
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.archived = 0
+        # Set if the archive thread failed; later dumps are dropped
+        self.error = None
+        os.makedirs(folder, exist_ok=True)
+        index_path = os.path.join(folder, INDEX_NAME)
+        self._number = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        self._index_file = open(index_path, 'ab')
+        # Drop a partial entry left by a crash so new entries stay aligned
+        self._index_file.truncate(self._number * INDEX_DTYPE.itemsize)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="WaveformArchiver", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def archive(self, snapshot, gains, offsets):
+        """Queue a WaveformSnapshot with the (windows x channels) gain/offset settings."""
+        if self.error is None and self._thread.is_alive():
+            self._queue.put((snapshot, gains, offsets))
+
+    def close(self):
+        """Write everything still queued and close the index."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+                self._write(*item)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._index_file.close()
+
+    def _write(self, snapshot, gains, offsets):
+        self._number += 1
+        stamp_ns = snapshot.stamp_ns if snapshot.stamp_ns is not None else now_ns()
+        geometry = snapshot.geometry
+        np.savez_compressed(
+            os.path.join(self.folder, archive_file_name(snapshot.buf_type, self._number)),
+            data=snapshot.data, gains=gains, offsets=offsets,
+            buf_type=snapshot.buf_type, version=snapshot.version,
+            stamp_ns=stamp_ns, wall_ns=to_wall_ns(stamp_ns),
+            num_channels=geometry.num_channels, points_per_channel=geometry.points_per_channel,
+            size=geometry.size)
+        # The index entry is written after its file, so it never points to a missing dump
+        entry = np.array([(to_wall_ns(stamp_ns), stamp_ns, snapshot.version, self._number,
+                           snapshot.buf_type.encode('ascii'))], dtype=INDEX_DTYPE)
+        self._index_file.write(entry.tobytes())
+        self._index_file.flush()
+        self.archived += 1
+
+class WaveformArchive:
+    """Read access to an archive folder through its memory-mapped index."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        index_path = os.path.join(folder, INDEX_NAME)
+        entries = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        if entries:
+            self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode='r', shape=(entries,))
+        else:
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def find(self, buf_type=None, start_wall_ns=None, end_wall_ns=None):
+        """Return the index positions of the dumps inside [start, end), optionally of one type."""
+        wall = self.index['wall_ns']
+        first = 0 if start_wall_ns is None else int(np.searchsorted(wall, start_wall_ns, side='left'))
+        last = len(wall) if end_wall_ns is None else int(np.searchsorted(wall, end_wall_ns, side='left'))
+        positions = np.arange(first, last)
+        if buf_type is not None:
+            positions = positions[self.index['buf_type'][first:last] == buf_type.encode('ascii')]
+        return positions
+
+    def load(self, position):
+        """Return the arrays and settings of one archived dump as a dict."""
+        entry = self.index[position]
+        path = os.path.join(self.folder, archive_file_name(entry['buf_type'].decode('ascii'), int(entry['number'])))
+        with np.load(path) as archive:
+            return {name: archive[name] for name in archive.files}